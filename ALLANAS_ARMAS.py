@@ -4,10 +4,17 @@ import pandas as pd
 import os
 from io import BytesIO
 
+import ALMACEN
+import ARRANQUE
+import COMPARTIDO
+import EXPORTAR
+import PARTICIONES
+import RESUMEN_DSICCO
+
 # ---------------------------------------------------------
 # CONFIGURACIÓN
 # ---------------------------------------------------------
-st.set_page_config(page_title="DSICCO – Resúmenes A 2025", layout="wide", page_icon="escudo.png")
+st.set_page_config(page_title="DSICCO – Resúmenes A 2025", layout="wide", page_icon=ARRANQUE.icono("escudo.png"))
 
 st.markdown("""
 <div style='text-align:center; background-color:#003366; padding:15px; border-radius:10px;'>
@@ -22,7 +29,7 @@ st.markdown("""
 # ---------------------------------------------------------
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-SAVED_FILE = os.path.join(UPLOAD_FOLDER, "DSICCO.xlsx")
+ARCHIVO = "DSICCO.xlsx"
 
 # ---------------------------------------------------------
 # FUNCIONES AUXILIARES
@@ -38,8 +45,22 @@ def nombre_mes(num):
     except:
         return "SIN MES"
 
-def cargar_excel(path):
-    return pd.read_excel(path, sheet_name=None)
+@COMPARTIDO.compartido("DSICCO (resumen por alcance)", max_entries=32)
+def resumen_alcance(path, unidad):
+    # unidad=None: resumen provincial, suma de los resúmenes de cada unidad
+    resumen = PARTICIONES.resumen(RESUMEN_DSICCO.cargar_indice(path), unidad)
+    allan = resumen["ALLANAMIENTOS"].sort_values(["MES", "UNIDAD"], ignore_index=True)
+    allan.insert(1, "MES_NOMBRE", allan["MES"].map(nombre_mes))
+    armas = resumen["ARMAS"].sort_values(["MES", "UNIDAD", "INTERVENCION"], ignore_index=True)
+    armas.insert(1, "MES_NOMBRE", armas["MES"].map(nombre_mes))
+    return {"ALLANAMIENTOS": allan, "ARMAS": armas, "TOTALES": resumen["TOTALES"]}
+
+def cargar_registros(path, unidad):
+    # Hojas completas (con OBSERVACIONES, DETALLE...) solo para exportar filas;
+    # una unidad lee solo su partición
+    if unidad is None:
+        return RESUMEN_DSICCO.cargar_completas(path)
+    return PARTICIONES.cargar(RESUMEN_DSICCO.cargar_indice_completo(path), unidad)
 
 
 def build_blocks(df, mes_col, mes_name_col, unidad_col="UNIDAD", interv_col="INTERVENCION", cant_col="CANTIDAD"):
@@ -139,53 +160,55 @@ def export_excel(blocks_allan, blocks_armas):
 uploaded = st.file_uploader("📂 Seleccioná archivo Excel", type=["xlsx"])
 
 if uploaded:
-      with open(SAVED_FILE, "wb") as f:
-         f.write(uploaded.getvalue())
-      st.success("✔ Archivo cargado y reemplazado correctamente.")
+    # Solo la primera vez: el uploader conserva el archivo entre reruns
+    resultado = ALMACEN.guardar_upload_una_vez(
+        ARCHIVO, uploaded.getvalue(), uploaded.file_id, st.session_state
+    )
+    if resultado is not None:
+        if resultado[1]:
+            st.success("✔ Archivo cargado y reemplazado correctamente.")
+        else:
+            st.caption("El archivo subido es igual a la versión actual; no se reprocesa.")
 
 # ---------------------------------------------------------
 # CARGAR ARCHIVO EXISTENTE
 # ---------------------------------------------------------
-if not os.path.exists(SAVED_FILE):
+SAVED_FILE = ALMACEN.ruta_actual(ARCHIVO)
+
+if SAVED_FILE is None:
     st.warning("📁 Todavía no hay archivo cargado.")
     st.stop()
 
 try:
-    excel = cargar_excel(SAVED_FILE)
+    indice = RESUMEN_DSICCO.cargar_indice(SAVED_FILE)
 except Exception as e:
     st.error(f"❌ Error al abrir el archivo guardado: {e}")
     st.stop()
 
-if "ALLANAMIENTOS" not in excel or "ARMAS" not in excel:
+columnas = indice["columnas"]
+if "ALLANAMIENTOS" not in columnas or "ARMAS" not in columnas:
     st.error("❌ El archivo debe contener ALLANAMIENTOS y ARMAS.")
     st.stop()
 
-allan = excel["ALLANAMIENTOS"].copy()
-allan.columns = allan.columns.str.upper().str.strip()
-
-armas = excel["ARMAS"].copy()
-armas.columns = armas.columns.str.upper().str.strip()
+# ---------------------------------------------------------
+# ALCANCE: UNA UNIDAD O TODA LA PROVINCIA
+# ---------------------------------------------------------
+# Con ?unidad=<UNIDAD> en la URL la página queda fija en esa unidad y solo
+# se usan su resumen y, al exportar, sus filas.
+unidad = PARTICIONES.selector_alcance("Unidad", PARTICIONES.valores(indice), "unidad", key="allan_unidad")
+alcance = None if unidad == "TODAS" else unidad
+resumen = resumen_alcance(SAVED_FILE, alcance)
 
 # ---------------------------------------------------------
 # PROCESAR ALLANAMIENTOS
 # ---------------------------------------------------------
 st.markdown("## 🔵 ALLANAMIENTOS")
 
-if "FECHA" not in allan.columns:
+if "FECHA" not in columnas["ALLANAMIENTOS"]:
     st.error("❌ ALLANAMIENTOS debe tener FECHA.")
     st.stop()
 
-allan["FECHA"] = pd.to_datetime(allan["FECHA"], errors="coerce")
-allan["MES"] = allan["FECHA"].dt.month.fillna(0).astype(int)
-allan["MES_NOMBRE"] = allan["MES"].apply(nombre_mes)
-allan["POSITIVO_FLAG"] = allan["RESULTADO"].astype(str).str.upper().str.contains("POS", na=False)
-allan["NEGATIVO_FLAG"] = allan["RESULTADO"].astype(str).str.upper().str.contains("NEG", na=False)
-allan["CANTIDAD"] = 1
-
-resumen_allan = (
-    allan.groupby(["MES", "MES_NOMBRE", "UNIDAD"], as_index=False)
-    .agg({"POSITIVO_FLAG": "sum", "NEGATIVO_FLAG": "sum", "CANTIDAD": "sum"})
-)
+resumen_allan = resumen["ALLANAMIENTOS"]
 
 blocks_allan = build_blocks(
     resumen_allan,
@@ -217,9 +240,9 @@ for mes in sorted(resumen_allan["MES"].unique()):
 # TOTALES DE ALLANAMIENTOS (debajo de los expanders)
 # ---------------------------------------------------------
 
-total_positivos = int(allan["POSITIVO_FLAG"].sum())
-total_negativos = int(allan["NEGATIVO_FLAG"].sum())
-total_allanamientos = int(allan["CANTIDAD"].sum())
+total_positivos = resumen["TOTALES"]["positivos"]
+total_negativos = resumen["TOTALES"]["negativos"]
+total_allanamientos = resumen["TOTALES"]["allanamientos"]
 
 st.write("### Total Positivos")
 st.markdown(f"<h2 style='margin-top:-10px;'>{total_positivos}</h2>", unsafe_allow_html=True)
@@ -237,28 +260,11 @@ st.markdown("## 🔴 ARMAS")
 
 required = ["FECHA", "TIPO", "INTERVENCION", "CANTIDAD"]
 for col in required:
-    if col not in armas.columns:
+    if col not in columnas["ARMAS"]:
         st.error(f"❌ La hoja ARMAS debe tener {col}.")
         st.stop()
 
-armas["FECHA"] = pd.to_datetime(armas["FECHA"], errors="coerce")
-armas["MES"] = armas["FECHA"].dt.month.fillna(0).astype(int)
-armas["MES_NOMBRE"] = armas["MES"].apply(nombre_mes)
-
-armas_validas = armas[
-    armas["TIPO"].astype(str).str.upper().str.contains("ARMA|TUMBERA", regex=True, na=False)
-].copy()
-
-armas_validas["CANTIDAD"] = (
-    pd.to_numeric(armas_validas["CANTIDAD"], errors="coerce")
-    .fillna(1)
-    .astype(int)
-)
-
-resumen_armas = (
-    armas_validas.groupby(["MES", "MES_NOMBRE", "UNIDAD", "INTERVENCION"], as_index=False)
-    .agg({"CANTIDAD": "sum"})
-)
+resumen_armas = resumen["ARMAS"]
 
 blocks_armas = build_blocks(
     resumen_armas,
@@ -311,3 +317,18 @@ st.download_button(
     file_name="Resumenes_DSICCO.xlsx",
     mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 )
+
+# ---------------------------------------------------------
+# EXPORTAR REGISTROS DEL MES
+# ---------------------------------------------------------
+# Las hojas completas se leen solo si se pide exportar
+if st.toggle("📤 Exportar registros de un mes"):
+    registros = cargar_registros(SAVED_FILE, alcance)
+    c1, c2 = st.columns(2)
+    hoja = c1.selectbox("Hoja", list(registros), key="allan_exportar_hoja")
+    filas = registros[hoja]
+    meses = filas["FECHA"].dt.month.fillna(0).astype(int)
+    mes = c2.selectbox("Mes", sorted(meses.unique()), format_func=nombre_mes, key="allan_exportar_mes")
+    EXPORTAR.boton_exportar(
+        filas[meses == mes], EXPORTAR.nombre_archivo(hoja, alcance, nombre_mes(mes)), key="allan_exportar"
+    )
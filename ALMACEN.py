@@ -0,0 +1,164 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+# ---------------------------------------------------------
+# ALMACÉN DE UPLOADS DIRECCIONADO POR CONTENIDO
+# ---------------------------------------------------------
+# Cada planilla subida se guarda una sola vez como
+# uploads/.store/<sha256>.xlsx y el manifiesto indica cuál es la
+# versión actual de cada archivo lógico (DSICCO.xlsx, MOVILES.xlsx...).
+# Volver a subir los mismos bytes no escribe nada en disco. `_lock`
+# serializa la lectura-modificación-escritura del manifiesto (subidas y
+# restauraciones de sesiones concurrentes no pierden versiones).
+UPLOAD_FOLDER = "uploads"
+STORE_FOLDER = os.path.join(UPLOAD_FOLDER, ".store")
+MANIFEST_FILE = os.path.join(UPLOAD_FOLDER, "manifest.json")
+
+_lock = threading.Lock()
+
+
+def _hash(datos):
+    return hashlib.sha256(datos).hexdigest()
+
+
+def _ruta_blob(digest):
+    return os.path.join(STORE_FOLDER, f"{digest}.xlsx")
+
+
+def _escribir_atomico(path, datos):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(datos)
+    os.replace(tmp, path)
+
+
+def leer_manifest():
+    if not os.path.exists(MANIFEST_FILE):
+        return {}
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_manifest(manifest):
+    datos = json.dumps(manifest, indent=2, ensure_ascii=False).encode("utf-8")
+    _escribir_atomico(MANIFEST_FILE, datos)
+
+
+def _registrar(manifest, nombre, digest, n_bytes, origen):
+    entrada = manifest.setdefault(nombre, {"actual": None, "versiones": []})
+    if not any(v["sha256"] == digest for v in entrada["versiones"]):
+        entrada["versiones"].append({
+            "sha256": digest,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "bytes": n_bytes,
+            "origen": origen
+        })
+    entrada["actual"] = digest
+
+
+def _publicar(nombre, digest):
+    # Copia de compatibilidad en uploads/<nombre> para quien lea la ruta fija.
+    # Se llama con `_lock` tomado, después de guardar el manifiesto.
+    destino = os.path.join(UPLOAD_FOLDER, nombre)
+    shutil.copyfile(_ruta_blob(digest), f"{destino}.tmp")
+    os.replace(f"{destino}.tmp", destino)
+
+
+def _importar_legado(manifest, nombre):
+    # La primera vez se incorpora el archivo suelto existente como versión inicial
+    legado = os.path.join(UPLOAD_FOLDER, nombre)
+    if nombre in manifest or not os.path.exists(legado):
+        return
+    with open(legado, "rb") as f:
+        datos = f.read()
+    digest = _hash(datos)
+    if not os.path.exists(_ruta_blob(digest)):
+        _escribir_atomico(_ruta_blob(digest), datos)
+    _registrar(manifest, nombre, digest, len(datos), "legado")
+
+
+# ---------------------------------------------------------
+# API
+# ---------------------------------------------------------
+def guardar_upload(nombre, datos):
+    """Guarda los bytes subidos para `nombre`.
+
+    Devuelve (digest, nuevo). `nuevo` es False cuando los bytes ya eran
+    la versión actual, en cuyo caso no se toca ningún archivo.
+    """
+    digest = _hash(datos)
+    with _lock:
+        manifest = leer_manifest()
+        if manifest.get(nombre, {}).get("actual") == digest:
+            return digest, False
+
+        os.makedirs(STORE_FOLDER, exist_ok=True)
+        _importar_legado(manifest, nombre)
+        if manifest.get(nombre, {}).get("actual") == digest:
+            _guardar_manifest(manifest)
+            return digest, False
+
+        if not os.path.exists(_ruta_blob(digest)):
+            _escribir_atomico(_ruta_blob(digest), datos)
+        _registrar(manifest, nombre, digest, len(datos), "upload")
+        _guardar_manifest(manifest)
+        _publicar(nombre, digest)
+    return digest, True
+
+
+def guardar_upload_una_vez(nombre, datos, id_archivo, procesados):
+    """`guardar_upload` solo la primera vez que una sesión entrega este archivo.
+
+    El file_uploader conserva el archivo entre reruns: sin esto, una
+    sesión que lo sigue teniendo cargado volvería a publicarlo después de
+    que otro usuario restaure una versión anterior. `procesados` es un
+    dict de la sesión (st.session_state); devuelve (digest, nuevo) o None
+    si el archivo ya se había procesado.
+    """
+    clave = f"_subido_{nombre}"
+    if procesados.get(clave) == id_archivo:
+        return None
+    resultado = guardar_upload(nombre, datos)
+    procesados[clave] = id_archivo
+    return resultado
+
+
+def version_actual(nombre):
+    return leer_manifest().get(nombre, {}).get("actual")
+
+
+def ruta_actual(nombre):
+    """Ruta de la versión actual de `nombre`, o None si no hay archivo."""
+    digest = version_actual(nombre)
+    if digest and os.path.exists(_ruta_blob(digest)):
+        return _ruta_blob(digest)
+    legado = os.path.join(UPLOAD_FOLDER, nombre)
+    return legado if os.path.exists(legado) else None
+
+
+def historial(nombre):
+    return list(leer_manifest().get(nombre, {}).get("versiones", []))
+
+
+def restaurar(nombre, digest):
+    """Vuelve `nombre` a una versión anterior ya almacenada."""
+    with _lock:
+        manifest = leer_manifest()
+        entrada = manifest.get(nombre)
+        if not entrada or not any(v["sha256"] == digest for v in entrada["versiones"]):
+            raise ValueError(f"No existe la versión {digest[:12]} de {nombre}")
+        if not os.path.exists(_ruta_blob(digest)):
+            raise FileNotFoundError(_ruta_blob(digest))
+        if entrada["actual"] == digest:
+            return False
+        entrada["actual"] = digest
+        _guardar_manifest(manifest)
+        _publicar(nombre, digest)
+    return True
@@ -1,7 +1,14 @@
 import streamlit as st
-import pandas as pd
 import os
 
+import ALMACEN
+import ARRANQUE
+
+# pandas y FLOTA se importan solo en las páginas que los usan: el menú
+# y la configuración no pagan ese costo.
+if os.environ.get("DSICCO_PRECALENTAR") == "1":
+    ARRANQUE.precalentar_en_segundo_plano()
+
 # -------------------------------------------------
 # CONFIGURACIÓN DE PÁGINA
 # -------------------------------------------------
@@ -49,6 +56,10 @@ elif opcion == "⚙️ Configuración":
 # TABLERO PRINCIPAL
 # -------------------------------------------------
 if st.session_state["pagina"] == "tablero":
+    import FLOTA
+    import PARTICIONES
+    import RESUMEN_DSICCO
+
     st.title("🛡️ DSICCO – Tablero de Control")
     st.caption("Dirección de Seguridad Interior Cutral Co")
     st.divider()
@@ -56,72 +67,39 @@ if st.session_state["pagina"] == "tablero":
     # ----------------- ARCHIVOS EXISTENTES -----------------
     UPLOAD_FOLDER = "uploads"
     os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-    EXCEL_FILE = os.path.join(UPLOAD_FOLDER, "DSICCO.xlsx")
-    MOVILES_FILE = os.path.join(UPLOAD_FOLDER, "MOVILES.xlsx")
+    EXCEL_FILE = ALMACEN.ruta_actual("DSICCO.xlsx")
+    MOVILES_FILE = ALMACEN.ruta_actual("MOVILES.xlsx")
 
-    if not os.path.exists(EXCEL_FILE):
+    if EXCEL_FILE is None:
         st.warning("📁 DSICCO.xlsx no encontrado en 'uploads'.")
-    if not os.path.exists(MOVILES_FILE):
+    if MOVILES_FILE is None:
         st.warning("📁 MOVILES.xlsx no encontrado en 'uploads'.")
 
     # ----------------- CARGAR DATOS -----------------
-    allan = pd.DataFrame()
-    armas = pd.DataFrame()
-    flota = pd.DataFrame()
-    motos = pd.DataFrame()
+    totales = {}
+    resumen_flota = {}
 
-    if os.path.exists(EXCEL_FILE):
+    if EXCEL_FILE is not None:
         try:
-            excel_data = pd.read_excel(EXCEL_FILE, sheet_name=None)
-            if "ALLANAMIENTOS" in excel_data:
-                allan = excel_data["ALLANAMIENTOS"].copy()
-                allan.columns = allan.columns.str.upper().str.strip()
-            if "ARMAS" in excel_data:
-                armas = excel_data["ARMAS"].copy()
-                armas.columns = armas.columns.str.upper().str.strip()
+            # Suma de los totales precalculados de cada unidad: no se recorren filas.
+            # Mismo índice que la página de allanamientos
+            totales = PARTICIONES.resumen(RESUMEN_DSICCO.cargar_indice(EXCEL_FILE))["TOTALES"]
         except:
             st.warning("No se pudo leer DSICCO.xlsx")
 
-    if os.path.exists(MOVILES_FILE):
+    if MOVILES_FILE is not None:
         try:
-            excel_m = pd.read_excel(MOVILES_FILE, sheet_name=None)
-            for h in excel_m.keys():
-                key_upper = h.upper()
-                df = excel_m[h].copy()
-                df.columns = df.columns.str.upper().str.strip()
-                for col in df.columns:
-                    df[col] = df[col].astype(str).str.upper().str.strip()
-                if "FLOTA" in key_upper:
-                    flota = df
-                    if "UNIDAD" not in flota.columns:
-                        flota["UNIDAD"] = "SIN UNIDAD"
-                elif "MOTO" in key_upper:
-                    motos = df
-                    if "UNIDAD" not in motos.columns:
-                        if "DESTINO" in motos.columns:
-                            motos["UNIDAD"] = motos["DESTINO"].replace({"": "SIN UNIDAD"}).fillna("SIN UNIDAD")
-                        else:
-                            motos["UNIDAD"] = "SIN UNIDAD"
+            # Conteos por UNIDAD y SITUACION ACTUAL mantenidos por diferencias entre versiones;
+            # misma carga compartida que la página de móviles
+            resumen_flota = FLOTA.cargar(MOVILES_FILE)["resumen"]
         except:
             st.warning("No se pudo leer MOVILES.xlsx")
 
     # ----------------- CALCULO KPIs -----------------
-    if not allan.empty:
-        allan["RESULTADO"] = allan["RESULTADO"].astype(str).str.upper()
-        allan_positivos = int(allan["RESULTADO"].str.contains("POS").sum())
-        allan_negativos = int(allan["RESULTADO"].str.contains("NEG").sum())
-    else:
-        allan_positivos = 0
-        allan_negativos = 0
-
-    if not armas.empty:
-        armas_fuego = armas[armas["TIPO"].astype(str).str.upper().str.contains("ARMA|TUMBERA", regex=True, na=False)]
-        cartucheria = armas[armas["TIPO"].astype(str).str.upper().str.contains("CARTUCHERIA", regex=True, na=False)]
-        armas_secuestradas = int(armas_fuego["CANTIDAD"].sum())
-        cartucheria_secuestrada = int(cartucheria["CANTIDAD"].sum())
-    else:
-        armas_secuestradas = 0
-        cartucheria_secuestrada = 0
+    allan_positivos = totales.get("positivos", 0)
+    allan_negativos = totales.get("negativos", 0)
+    armas_secuestradas = totales.get("armas_fuego", 0)
+    cartucheria_secuestrada = totales.get("cartucheria", 0)
 
     # ----------------- MOSTRAR KPIs -----------------
     st.subheader("📊 Resumen Principal")
@@ -146,16 +124,8 @@ if st.session_state["pagina"] == "tablero":
     st.divider()
     st.subheader("🚓 Estado de Móviles y Motocicletas")
 
-    def resumen_estado(df):
-        if "SITUACION ACTUAL" in df.columns:
-            df["SITUACION ACTUAL"] = df["SITUACION ACTUAL"].str.upper().str.strip()
-            en_servicio = df[df["SITUACION ACTUAL"]=="EN SERVICIO"].shape[0]
-            fuera_servicio = df[df["SITUACION ACTUAL"]=="FUERA DE SERVICIO"].shape[0]
-            return en_servicio, fuera_servicio
-        return 0,0
-
-    moviles_en, moviles_fuera = resumen_estado(flota)
-    motos_en, motos_fuera = resumen_estado(motos)
+    moviles_en, moviles_fuera = FLOTA.servicio(resumen_flota.get("FLOTA", {}))
+    motos_en, motos_fuera = FLOTA.servicio(resumen_flota.get("MOTOS", {}))
 
     c1, c2, c3, c4 = st.columns(4)
     if c1.button(f"🚓 Móviles En Servicio: {moviles_en}"):
@@ -176,7 +146,7 @@ if st.session_state["pagina"] == "tablero":
 # -------------------------------------------------
 elif st.session_state["pagina"] == "allanamientos":
     st.title("📊 Allanamientos y Armas")
-    allan_path = os.path.join(os.getcwd(), "allanas_armas.py")
+    allan_path = os.path.join(os.getcwd(), "ALLANAS_ARMAS.py")
     if os.path.exists(allan_path):
         with open(allan_path, "r", encoding="utf-8") as f:
             code = f.read()
@@ -184,16 +154,16 @@ elif st.session_state["pagina"] == "allanamientos":
         try:
             exec(code, exec_namespace)
         except Exception as e:
-            st.error(f"Error ejecutando allanas_armas.py: {e}")
+            st.error(f"Error ejecutando ALLANAS_ARMAS.py: {e}")
     else:
-        st.error("No se encontró allanas_armas.py en la carpeta de la app.")
+        st.error("No se encontró ALLANAS_ARMAS.py en la carpeta de la app.")
 
 # -------------------------------------------------
 # MÓVILES DSICCO
 # -------------------------------------------------
 elif st.session_state["pagina"] == "moviles":
     st.title("🚓 Móviles DSICCO")
-    moviles_path = os.path.join(os.getcwd(), "moviles.py")
+    moviles_path = os.path.join(os.getcwd(), "MOVILES.py")
     if os.path.exists(moviles_path):
         with open(moviles_path, "r", encoding="utf-8") as f:
             code = f.read()
@@ -201,9 +171,9 @@ elif st.session_state["pagina"] == "moviles":
         try:
             exec(code, exec_namespace)
         except Exception as e:
-            st.error(f"Error ejecutando moviles.py: {e}")
+            st.error(f"Error ejecutando MOVILES.py: {e}")
     else:
-        st.error("No se encontró moviles.py en la carpeta de la app.")
+        st.error("No se encontró MOVILES.py en la carpeta de la app.")
 
 
 # -------------------------------------------------
@@ -211,7 +181,7 @@ elif st.session_state["pagina"] == "moviles":
 # -------------------------------------------------
 elif st.session_state["pagina"] == "taller":
     st.title("🛠️ Taller Mecánico – Gestión de Móviles")
-    taller_path = os.path.join(os.getcwd(), "TALLER_MOVILES.PY")
+    taller_path = os.path.join(os.getcwd(), "TALLER_MOVILES.py")
 
     if os.path.exists(taller_path):
         with open(taller_path, "r", encoding="utf-8") as f:
@@ -220,9 +190,9 @@ elif st.session_state["pagina"] == "taller":
         try:
             exec(code, exec_namespace)
         except Exception as e:
-            st.error(f"Error ejecutando taller_moviles.py: {e}")
+            st.error(f"Error ejecutando TALLER_MOVILES.py: {e}")
     else:
-        st.warning("No se encontró el archivo taller_moviles.py")
+        st.warning("No se encontró el archivo TALLER_MOVILES.py")
 
 # -------------------------------------------------
 # CONFIGURACIÓN
@@ -230,3 +200,50 @@ elif st.session_state["pagina"] == "taller":
 elif st.session_state["pagina"] == "configuracion":
     st.title("⚙️ Configuración")
     st.info("Parámetros del sistema (sin subida de archivos).")
+
+    # ----------------- VERSIONES DE PLANILLAS -----------------
+    st.subheader("🗂️ Versiones de planillas")
+    for nombre in ("DSICCO.xlsx", "MOVILES.xlsx"):
+        versiones = ALMACEN.historial(nombre)
+        actual = ALMACEN.version_actual(nombre)
+        with st.expander(f"{nombre} – {len(versiones)} versión(es)"):
+            if not versiones:
+                st.caption("Sin versiones registradas.")
+                continue
+            etiquetas = {
+                v["sha256"]: f"{v['fecha']} · {v['sha256'][:12]} · {v['bytes']} bytes"
+                + (" (actual)" if v["sha256"] == actual else "")
+                for v in reversed(versiones)
+            }
+            elegida = st.selectbox(
+                "Versión", list(etiquetas), format_func=etiquetas.get, key=f"version_{nombre}"
+            )
+            if st.button("↩️ Restaurar esta versión", key=f"restaurar_{nombre}", disabled=elegida == actual):
+                ALMACEN.restaurar(nombre, elegida)
+                st.success("✔ Versión restaurada.")
+                st.rerun()
+
+    # ----------------- MEMORIA -----------------
+    # MEMORIA no importa pandas: la configuración sigue sin pagar ese costo
+    import MEMORIA
+
+    st.subheader("🧠 Memoria del servidor")
+    datasets = MEMORIA.reporte_datasets()
+    sesiones = MEMORIA.reporte_sesiones()
+    compartidos = sum(d["MB"] for d in datasets)
+    propios = sum(s["MB PROPIOS"] for s in sesiones)
+    c1, c2, c3 = st.columns(3)
+    c1.metric("Datos compartidos (MB)", f"{compartidos:.2f}")
+    c2.metric("Datos propios de sesiones (MB)", f"{propios:.2f}")
+    c3.metric("Sesiones activas", len(sesiones))
+    st.caption(
+        "Cada planilla se carga una vez por proceso y todas las sesiones la leen sin copiarla; "
+        f"con una copia por sesión serían ~{compartidos * max(len(sesiones), 1) + propios:.2f} MB."
+    )
+    st.markdown("\n".join(
+        f"- **{d['DATASET']}** · `{d['VERSIÓN']}` · {d['MB']:.2f} MB" for d in datasets
+    ) or "Sin planillas cargadas todavía.")
+    st.markdown("\n".join(
+        f"- Sesión `{s['SESIÓN']}` · {s['MB PROPIOS']:.2f} MB propios" + (f" ({s['DETALLE']})" if s["DETALLE"] else "")
+        for s in sesiones
+    ) or "Sin sesiones con datos propios.")
@@ -0,0 +1,133 @@
+import os
+import sys
+import threading
+import time
+import warnings
+
+import ALMACEN
+
+# ---------------------------------------------------------
+# ARRANQUE Y PRECALENTADO DEL SERVIDOR
+# ---------------------------------------------------------
+# Uso:  python ARRANQUE.py [opciones de streamlit run]
+# Arranca `streamlit run APP.py` en este mismo proceso y, en paralelo,
+# importa pandas/openpyxl, genera las variantes chicas de escudo.png y
+# deja al día el estado de la flota y los índices del taller, para que
+# el primer usuario no pague todo eso.
+# Con `streamlit run APP.py` se obtiene lo mismo definiendo
+# DSICCO_PRECALENTAR=1 (se dispara en la primera sesión).
+CACHE_FOLDER = ".cache"
+ESCUDO = "escudo.png"
+TALLER_FILE = os.path.join(ALMACEN.UPLOAD_FOLDER, "TALLER_MOVILES.xlsx")
+
+_iniciado = False
+_lock = threading.Lock()
+_lock_icono = threading.Lock()
+
+
+# ---------------------------------------------------------
+# RECURSOS ESTÁTICOS
+# ---------------------------------------------------------
+def icono(path=ESCUDO, lado=64):
+    """Ruta a una copia de `path` reducida a `lado` px, generada una sola vez.
+
+    Si no se puede generar (sin Pillow, archivo ilegible) devuelve `path`.
+    """
+    if not os.path.exists(path):
+        return path
+    base = os.path.splitext(os.path.basename(path))[0]
+    destino = os.path.join(CACHE_FOLDER, f"{base}_{lado}.png")
+    if os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(path):
+        return destino
+    # Decodificar el original ocupa cientos de MB: una sola sesión lo genera
+    with _lock_icono:
+        if os.path.exists(destino) and os.path.getmtime(destino) >= os.path.getmtime(path):
+            return destino
+        return _generar_icono(path, destino, lado)
+
+
+def _generar_icono(path, destino, lado):
+    try:
+        from PIL import Image
+
+        os.makedirs(CACHE_FOLDER, exist_ok=True)
+        with warnings.catch_warnings():
+            # escudo.png es propio y muy grande: no es una "decompression bomb"
+            warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+            with Image.open(path) as img:
+                img.thumbnail((lado, lado))
+                tmp = f"{destino}.tmp"
+                img.save(tmp, format="PNG", optimize=True)
+        os.replace(tmp, destino)
+        return destino
+    except Exception:
+        return path
+
+
+# ---------------------------------------------------------
+# PRECALENTADO
+# ---------------------------------------------------------
+def precalentar():
+    """Deja listos imports, recursos y datos derivados. Devuelve tiempos en s."""
+    tiempos = {}
+
+    t = time.perf_counter()
+    import pandas  # noqa: F401
+    import COMPARTIDO  # noqa: F401  (Copy-on-Write antes de crear DataFrames)
+    import openpyxl  # noqa: F401
+    tiempos["imports"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    icono(ESCUDO, 64)
+    tiempos["escudo"] = time.perf_counter() - t
+
+    import FLOTA
+    import RESUMEN_DSICCO
+    import TALLER_INDICES
+
+    t = time.perf_counter()
+    moviles = ALMACEN.ruta_actual("MOVILES.xlsx")
+    if moviles:
+        # Sincroniza la flota y la parte por DIRECCION
+        FLOTA.indice(moviles)
+    tiempos["flota"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    if os.path.exists(TALLER_FILE):
+        TALLER_INDICES.cargar(TALLER_FILE, lambda: TALLER_INDICES.leer_taller_excel(TALLER_FILE))
+    tiempos["taller"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    dsicco = ALMACEN.ruta_actual("DSICCO.xlsx")
+    if dsicco:
+        # Particiones por UNIDAD y sus resúmenes (columnas declaradas), y las
+        # de las hojas completas para exportar filas de una unidad
+        RESUMEN_DSICCO.indice(dsicco)
+        RESUMEN_DSICCO.indice_completo(dsicco)
+    tiempos["dsicco"] = time.perf_counter() - t
+    return tiempos
+
+
+def precalentar_en_segundo_plano():
+    """Lanza `precalentar` en un hilo daemon, una sola vez por proceso."""
+    global _iniciado
+    with _lock:
+        if _iniciado:
+            return
+        _iniciado = True
+
+    def _correr():
+        try:
+            precalentar()
+        except Exception as e:
+            print(f"[ARRANQUE] precalentado incompleto: {e}", file=sys.stderr)
+
+    threading.Thread(target=_correr, name="dsicco-precalentar", daemon=True).start()
+
+
+if __name__ == "__main__":
+    from streamlit.web import cli as stcli
+
+    precalentar_en_segundo_plano()
+    sys.argv = ["streamlit", "run", "APP.py", *sys.argv[1:]]
+    sys.exit(stcli.main())
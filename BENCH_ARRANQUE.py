@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# ---------------------------------------------------------
+# BENCHMARK DE ARRANQUE EN FRÍO
+# ---------------------------------------------------------
+# Uso:  python BENCH_ARRANQUE.py [--repeticiones 5] [--paginas tablero moviles]
+# Cada medición corre en un proceso nuevo sobre una copia limpia del
+# proyecto (sin .cache ni estados derivados) y mide el tiempo hasta el
+# primer render de la página con el AppTest headless de Streamlit.
+# Escenarios:
+#   frio         -> el primer usuario paga imports, escudo y parseo
+#   precalentado -> ARRANQUE.precalentar() corrió antes del primer usuario
+PAGINAS = {
+    "tablero": "APP.py",
+    "allanamientos": "ALLANAS_ARMAS.py",
+    "moviles": "MOVILES.py",
+    "taller": "TALLER_MOVILES.py",
+}
+
+IGNORAR = shutil.ignore_patterns(
+    ".git", ".cache", ".store", ".particiones", "__pycache__", "manifest.json",
+    "flota_estado.pkl", "flota_eventos.jsonl", "*.indices.pkl",
+)
+
+HIJO = """
+import json, sys, time
+if sys.argv[2] == "precalentado":
+    import ARRANQUE
+    ARRANQUE.precalentar()
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[1], default_timeout=600).run()
+t1 = time.perf_counter()
+print(json.dumps({"primer_render": t1 - t0, "errores": len(at.exception)}))
+"""
+
+
+def medir(origen, script, escenario):
+    with tempfile.TemporaryDirectory(prefix="dsicco_bench_") as tmp:
+        copia = os.path.join(tmp, "app")
+        shutil.copytree(origen, copia, ignore=IGNORAR)
+        salida = subprocess.run(
+            [sys.executable, "-c", HIJO, script, escenario],
+            cwd=copia, capture_output=True, text=True, check=True,
+        )
+        return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo hasta el primer render por página")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--paginas", nargs="+", choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument("--json", action="store_true", help="imprime el resultado en JSON")
+    args = parser.parse_args()
+
+    origen = os.path.dirname(os.path.abspath(__file__))
+    resultados = []
+    for pagina in args.paginas:
+        for escenario in ("frio", "precalentado"):
+            tiempos, errores = [], 0
+            for _ in range(args.repeticiones):
+                r = medir(origen, PAGINAS[pagina], escenario)
+                tiempos.append(r["primer_render"])
+                errores += r["errores"]
+            resultados.append({
+                "pagina": pagina,
+                "escenario": escenario,
+                "mediana_s": round(statistics.median(tiempos), 3),
+                "min_s": round(min(tiempos), 3),
+                "max_s": round(max(tiempos), 3),
+                "errores": errores,
+            })
+
+    if args.json:
+        print(json.dumps(resultados, indent=2, ensure_ascii=False))
+        return
+
+    print(f"{'PÁGINA':<15}{'ESCENARIO':<14}{'MEDIANA':>9}{'MIN':>9}{'MAX':>9}{'ERR':>5}")
+    for r in resultados:
+        print(f"{r['pagina']:<15}{r['escenario']:<14}{r['mediana_s']:>9.3f}"
+              f"{r['min_s']:>9.3f}{r['max_s']:>9.3f}{r['errores']:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from BENCH_ARRANQUE import IGNORAR
+
+# ---------------------------------------------------------
+# PRUEBA DE CARGA CON SESIONES CONCURRENTES
+# ---------------------------------------------------------
+# Uso:  python BENCH_CARGA.py [--sesiones 20] [--interacciones 10] [--filas 2000]
+#                             [--json salida.json] [--base base.json]
+# Por cada página se genera una copia del proyecto con planillas
+# sintéticas y N sesiones AppTest arrancan a la vez (cambio de turno) y
+# repiten interacciones guionadas. AppTest no es seguro entre hilos
+# (reemplaza el Runtime global), así que cada sesión corre en su propio
+# proceso: comparten lo que queda en disco (particiones, estado de la
+# flota, íconos) pero no st.cache_resource, y el RSS informado es el de
+# la sesión más pesada y la suma de todas. El ícono reducido de
+# escudo.png se genera antes de medir, como lo hace ARRANQUE al iniciar
+# el servidor. Se informa latencia de rerun p50/p95/p99, reruns por
+# segundo y RSS. Con --base se comparan los resultados contra una
+# corrida anterior guardada con --json.
+PAGINAS = {
+    "tablero": "APP.py",
+    "allanamientos": "ALLANAS_ARMAS.py",
+    "moviles": "MOVILES.py",
+    "taller": "TALLER_MOVILES.py",
+}
+
+
+# ---------------------------------------------------------
+# INTERACCIONES GUIONADAS
+# ---------------------------------------------------------
+def _elegir(widgets, etiqueta, rnd):
+    for w in widgets:
+        if w.label == etiqueta and len(w.options) > 0:
+            return w.set_value(rnd.choice(list(w.options)))
+    return None
+
+
+def interaccion(pagina, at, rnd):
+    """Aplica a `at` una interacción típica de la página (sin escrituras)."""
+    if pagina == "moviles":
+        _elegir(at.selectbox, rnd.choice(["DESTINO", "DIRECCIÓN"]), rnd)
+    elif pagina == "taller":
+        if rnd.random() < 0.5:
+            _elegir(at.selectbox, "Unidad", rnd)
+        else:
+            _elegir(at.radio, "Período", rnd)
+    # El tablero y allanamientos no tienen filtros: se mide un rerun simple
+    # (los botones y el menú del tablero llevan a otras páginas)
+
+
+# ---------------------------------------------------------
+# PROCESO HIJO: UNA SESIÓN
+# ---------------------------------------------------------
+def correr_sesion(pagina, interacciones, semilla):
+    from streamlit.testing.v1 import AppTest
+
+    rnd = random.Random(semilla)
+    at = AppTest.from_file(PAGINAS[pagina], default_timeout=600)
+    # Todas las sesiones arrancan juntas: el padre libera a las que están listas
+    print("LISTO", flush=True)
+    sys.stdin.readline()
+
+    t = time.perf_counter()
+    at.run()
+    tiempos = [time.perf_counter() - t]
+    for _ in range(interacciones):
+        interaccion(pagina, at, rnd)
+        t = time.perf_counter()
+        at.run()
+        tiempos.append(time.perf_counter() - t)
+    return {
+        "tiempos": tiempos,
+        "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "errores": [e.value for e in at.exception],
+    }
+
+
+# ---------------------------------------------------------
+# PROCESO PRINCIPAL
+# ---------------------------------------------------------
+def _pct(datos, p):
+    if len(datos) < 2:
+        return datos[0] if datos else 0.0
+    return statistics.quantiles(datos, n=100, method="inclusive")[p - 1]
+
+
+def _ms(segundos):
+    return round(segundos * 1000, 1)
+
+
+def correr_pagina(copia, pagina, args):
+    hijos = [
+        subprocess.Popen(
+            [sys.executable, os.path.join(copia, "BENCH_CARGA.py"), "--hijo", pagina,
+             "--interacciones", str(args.interacciones), "--semilla", str(args.semilla + i)],
+            cwd=copia, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        for i in range(args.sesiones)
+    ]
+    for hijo in hijos:
+        for linea in hijo.stdout:
+            if linea.strip() == "LISTO":
+                break
+        else:
+            raise RuntimeError(f"una sesión de {pagina} no llegó a iniciar (código {hijo.wait()})")
+    t0 = time.perf_counter()
+    for hijo in hijos:
+        hijo.stdin.write("\n")
+        hijo.stdin.flush()
+    sesiones = []
+    for hijo in hijos:
+        salida, _ = hijo.communicate()
+        if hijo.returncode != 0:
+            raise RuntimeError(f"una sesión de {pagina} terminó con código {hijo.returncode}:\n{salida[-2000:]}")
+        sesiones.append(json.loads(salida.strip().splitlines()[-1]))
+    total = time.perf_counter() - t0
+
+    primeros = [s["tiempos"][0] for s in sesiones]
+    reruns = [t for s in sesiones for t in s["tiempos"][1:]]
+    rss = [s["rss_kb"] for s in sesiones]
+    return {
+        "pagina": pagina,
+        "sesiones": len(sesiones),
+        "reruns": len(primeros) + len(reruns),
+        "primer_render_p50_ms": _ms(_pct(primeros, 50)),
+        "rerun_p50_ms": _ms(_pct(reruns, 50)),
+        "rerun_p95_ms": _ms(_pct(reruns, 95)),
+        "rerun_p99_ms": _ms(_pct(reruns, 99)),
+        "reruns_por_s": round((len(primeros) + len(reruns)) / total, 2),
+        "rss_max_mb": round(max(rss) / 1024, 1),
+        "rss_suma_mb": round(sum(rss) / 1024, 1),
+        "errores": sorted({e for s in sesiones for e in s["errores"]}),
+    }
+
+
+def medir(origen, pagina, args):
+    from DATOS_SINTETICOS import generar
+
+    with tempfile.TemporaryDirectory(prefix="dsicco_carga_") as tmp:
+        copia = os.path.join(tmp, "app")
+        shutil.copytree(origen, copia, ignore=IGNORAR)
+        generar(os.path.join(copia, "uploads"), args.filas, args.semilla)
+        # El original de escudo.png ocupa más de 1 GB decodificado: no se mide eso
+        subprocess.run([sys.executable, "-c", "import ARRANQUE; ARRANQUE.icono()"], cwd=copia, check=True)
+        return correr_pagina(copia, pagina, args)
+
+
+def imprimir(resultados, base):
+    previos = {r["pagina"]: r for r in base}
+    print(f"{'PÁGINA':<15}{'P50':>9}{'P95':>9}{'P99':>9}{'RERUN/S':>9}{'RSS MB':>9}{'SUMA MB':>9}  ERRORES")
+    for r in resultados:
+        print(f"{r['pagina']:<15}{r['rerun_p50_ms']:>9}{r['rerun_p95_ms']:>9}{r['rerun_p99_ms']:>9}"
+              f"{r['reruns_por_s']:>9}{r['rss_max_mb']:>9}{r.get('rss_suma_mb', 0):>9}  {len(r['errores'])}")
+        b = previos.get(r["pagina"])
+        if b:
+            print(f"{'  vs base':<15}" + "".join(
+                f"{(r[k] - b[k]) / b[k] * 100 if b[k] else 0:>+8.0f}%"
+                for k in ("rerun_p50_ms", "rerun_p95_ms", "rerun_p99_ms", "reruns_por_s", "rss_max_mb")
+            ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia de rerun con sesiones concurrentes")
+    parser.add_argument("--paginas", nargs="+", choices=list(PAGINAS), default=list(PAGINAS))
+    parser.add_argument("--sesiones", type=int, default=10)
+    parser.add_argument("--interacciones", type=int, default=5)
+    parser.add_argument("--filas", type=int, default=1000, help="allanamientos generados (el resto escala)")
+    parser.add_argument("--semilla", type=int, default=2025)
+    parser.add_argument("--json", help="guarda los resultados en este archivo")
+    parser.add_argument("--base", help="resultados previos (--json) para comparar")
+    parser.add_argument("--hijo", choices=list(PAGINAS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(correr_sesion(args.hijo, args.interacciones, args.semilla)))
+        return
+
+    origen = os.path.dirname(os.path.abspath(__file__))
+    resultados = [medir(origen, pagina, args) for pagina in args.paginas]
+
+    base = []
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+    imprimir(resultados, base)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
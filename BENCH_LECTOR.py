@@ -0,0 +1,87 @@
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+import LECTOR
+from DATOS_SINTETICOS import escribir_dsicco
+
+# ---------------------------------------------------------
+# BENCHMARK DE LECTURA DE PLANILLAS
+# ---------------------------------------------------------
+# Uso:  python BENCH_LECTOR.py [--filas 20000] [--repeticiones 3]
+# Compara, para cada motor instalado, la lectura completa de siempre
+# (sheet_name=None) contra LECTOR con las hojas/columnas que declara la
+# página de allanamientos, en serie y con el pool de procesos. Se mide sobre
+# uploads/DSICCO.xlsx y sobre un DSICCO sintético de --filas filas.
+HOJAS = {
+    "ALLANAMIENTOS": {"FECHA": "fecha", "UNIDAD": None, "RESULTADO": None},
+    "ARMAS": {"FECHA": "fecha", "UNIDAD": None, "INTERVENCION": None, "TIPO": None, "CANTIDAD": "numero"},
+}
+
+
+def motores_instalados():
+    motores = ["openpyxl"]
+    try:
+        import python_calamine  # noqa: F401
+        motores.insert(0, "calamine")
+    except ImportError:
+        pass
+    return motores
+
+
+def cronometrar(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        t = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t)
+    return statistics.median(tiempos)
+
+
+def comparar(path, repeticiones):
+    filas = []
+    for motor in motores_instalados():
+        casos = {
+            "completo": lambda: pd.read_excel(path, sheet_name=None, engine=motor),
+            "declarado": lambda: LECTOR.leer_hojas(path, HOJAS, motor=motor, paralelo=False),
+            "declarado+procesos": lambda: LECTOR.leer_hojas(path, HOJAS, motor=motor, paralelo=True),
+        }
+        # El pool se crea una vez por servidor: no se cuenta su arranque
+        LECTOR.leer_hojas(path, HOJAS, motor=motor, paralelo=True)
+        for caso, funcion in casos.items():
+            filas.append((motor, caso, cronometrar(funcion, repeticiones)))
+    return filas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara motores y estrategias de lectura xlsx")
+    parser.add_argument("--filas", type=int, default=20000, help="allanamientos del archivo sintético")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    archivos = []
+    real = os.path.join("uploads", "DSICCO.xlsx")
+    if os.path.exists(real):
+        archivos.append(("DSICCO.xlsx real", real))
+
+    with tempfile.TemporaryDirectory(prefix="dsicco_lector_") as tmp:
+        sintetico = os.path.join(tmp, "DSICCO.xlsx")
+        escribir_dsicco(sintetico, args.filas, random.Random(2025))
+        archivos.append((f"sintético {args.filas} filas", sintetico))
+
+        for titulo, path in archivos:
+            print(f"\n{titulo} ({os.path.getsize(path) / 1e6:.1f} MB)")
+            resultados = comparar(path, args.repeticiones)
+            base = next(t for m, c, t in resultados if m == "openpyxl" and c == "completo")
+            print(f"{'MOTOR':<10}{'CASO':<22}{'SEGUNDOS':>10}{'VS BASE':>10}")
+            for motor, caso, t in resultados:
+                print(f"{motor:<10}{caso:<22}{t:>10.3f}{base / t:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
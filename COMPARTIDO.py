@@ -0,0 +1,156 @@
+import functools
+import hashlib
+import inspect
+import types
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import MEMORIA
+
+# ---------------------------------------------------------
+# CAPA DE DATOS COMPARTIDA (SOLO LECTURA) Y MEMORIA POR SESIÓN
+# ---------------------------------------------------------
+# Las planillas se cargan una vez por versión de archivo con
+# st.cache_resource y el mismo DataFrame lo usan todas las sesiones
+# (st.cache_data, en cambio, entrega una copia deserializada en cada
+# llamada). Con Copy-on-Write cada página recibe una vista: renombrar,
+# agregar o reemplazar columnas, o editar celdas con .loc, copia solo lo
+# que se toca y nunca modifica el DataFrame compartido. Por eso las
+# páginas ya no hacen .copy() defensivos.
+#
+# Uso:
+#     @COMPARTIDO.compartido("DSICCO")
+#     def cargar_excel(path):
+#         return LECTOR.leer_hojas(path, HOJAS)
+#
+#     COMPARTIDO.contar("allanamientos", allan)  # bytes propios de la sesión
+
+# pandas 3 ya trabaja siempre con Copy-on-Write. Se activa al importar este
+# módulo, antes de crear DataFrames (páginas y ARRANQUE lo importan primero).
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+
+# ---------------------------------------------------------
+# VISTAS Y CONTEO DE BYTES
+# ---------------------------------------------------------
+def vista(datos):
+    """Vistas Copy-on-Write de los DataFrames/Series dentro de `datos` (dict, list, tuple)."""
+    if isinstance(datos, (pd.DataFrame, pd.Series)):
+        return datos.copy(deep=False)
+    if isinstance(datos, dict):
+        return {k: vista(v) for k, v in datos.items()}
+    if isinstance(datos, (list, tuple)):
+        return type(datos)(vista(v) for v in datos)
+    return datos
+
+
+def _frames(datos):
+    if isinstance(datos, pd.DataFrame):
+        yield datos
+    elif isinstance(datos, dict):
+        for v in datos.values():
+            yield from _frames(v)
+    elif isinstance(datos, (list, tuple)):
+        for v in datos:
+            yield from _frames(v)
+
+
+def _raiz(valores):
+    # Dueño real de la memoria: las vistas de numpy apuntan a él por .base
+    while isinstance(valores.base, np.ndarray):
+        valores = valores.base
+    return id(valores)
+
+
+def _columnas(df):
+    """(id del buffer o None, serie) por columna."""
+    for i in range(df.shape[1]):
+        serie = df.iloc[:, i]
+        valores = serie.values
+        raiz = _raiz(valores) if isinstance(valores, np.ndarray) else None
+        yield raiz, serie
+
+
+def _bytes_privados(df, compartidas):
+    # deep=False: una columna de texto filtrada copia los punteros, no los strings
+    return sum(
+        int(serie.memory_usage(deep=False, index=False))
+        for raiz, serie in _columnas(df)
+        if raiz is None or raiz not in compartidas
+    )
+
+
+# ---------------------------------------------------------
+# DATASETS COMPARTIDOS
+# ---------------------------------------------------------
+def _registrar_dataset(nombre, version, datos, max_entries):
+    raices, total = set(), 0
+    for df in _frames(datos):
+        total += int(df.memory_usage(deep=True, index=True).sum())
+        raices.update(raiz for raiz, _ in _columnas(df) if raiz is not None)
+    MEMORIA.registrar_dataset(nombre, version, total, raices, max_entries)
+
+
+def _codigo(code):
+    # Bytecode, nombres y constantes (también de lambdas y funciones internas),
+    # sin el repr de los objetos code, que lleva su dirección de memoria
+    partes = [code.co_code, repr(code.co_names).encode("utf-8")]
+    for c in code.co_consts:
+        partes.append(_codigo(c) if isinstance(c, types.CodeType) else repr(c).encode("utf-8"))
+    return b"|".join(partes)
+
+
+def _huella(funcion):
+    """Hash del código de `funcion`: editar el cargador invalida su caché."""
+    try:
+        codigo = inspect.getsource(funcion).encode("utf-8")
+    except (OSError, TypeError):
+        # Páginas ejecutadas con exec() desde APP.py: no hay archivo fuente
+        codigo = _codigo(funcion.__code__)
+    return hashlib.sha1(codigo).hexdigest()[:12]
+
+
+def compartido(nombre, max_entries=2):
+    """Decorador: carga cacheada una vez por proceso y entregada como vista.
+
+    `max_entries` limita cuántas versiones del archivo quedan en memoria.
+    """
+    def decorador(funcion):
+        def cargar(*args):
+            datos = funcion(*args)
+            _registrar_dataset(nombre, " · ".join(str(a) for a in args), datos, max_entries)
+            return datos
+
+        # Streamlit arma la clave de caché con __module__, __qualname__ y el
+        # código de `cargar`, que es el mismo para todos los datasets: el
+        # nombre del dataset y la huella de `funcion` van en __qualname__.
+        # Sin functools.wraps, para que no siga __wrapped__ hasta `funcion`
+        # (en las páginas ejecutadas con exec() eso falla y dos cargadores
+        # homónimos compartían la caché).
+        cargar.__module__ = funcion.__module__
+        cargar.__qualname__ = f"{funcion.__qualname__}[{nombre}:{_huella(funcion)}]"
+        cargar = st.cache_resource(show_spinner=False, max_entries=max_entries)(cargar)
+
+        @functools.wraps(funcion)
+        def obtener(*args):
+            return vista(cargar(*args))
+
+        obtener.clear = cargar.clear
+        return obtener
+
+    return decorador
+
+
+# ---------------------------------------------------------
+# MEMORIA PROPIA DE CADA SESIÓN (registro y reportes en MEMORIA)
+# ---------------------------------------------------------
+def contar(nombre, datos):
+    """Anota los bytes de `datos` que no comparte con ningún dataset; devuelve `datos`."""
+    sesion = MEMORIA.sesion()
+    if sesion is not None:
+        compartidas = MEMORIA.raices_compartidas()
+        sesion.bytes[nombre] = sum(_bytes_privados(df, compartidas) for df in _frames(datos))
+    return datos
@@ -0,0 +1,149 @@
+import os
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# ---------------------------------------------------------
+# PLANILLAS SINTÉTICAS PARA BENCHMARKS Y PRUEBAS DE CARGA
+# ---------------------------------------------------------
+# Imitan la forma de DSICCO.xlsx, MOVILES.xlsx y TALLER_MOVILES.xlsx
+# (hojas, columnas, textos largos, hoja oculta) con el tamaño pedido.
+# Uso:  python DATOS_SINTETICOS.py <carpeta> [--filas 5000]
+UNIDADES = [
+    "CRIA 6TA", "CRIA 9", "CRIA 14TA", "CRIA 15TA", "CRIA 42", "CNAF 4",
+    "DIVISION INVESTIGACIONES", "DIVISION CRIMINALISTICA", "DIVISION ADM. LOGISTICA",
+]
+DIRECCIONES = ["DSICCO", "DIRECCION SEGURIDAD CUTRAL CO", "DIRECCION ZONA II"]
+SITUACIONES = ["En servicio"] * 7 + ["Fuera de servicio"] * 2 + ["DE BAJA"]
+MARCAS = [("VOLKSWAGEN", "VIRTUS"), ("CHEVROLET", "PRISMA"), ("TOYOTA", "HILUX"), ("FORD", "RANGER")]
+MARCAS_MOTO = [("YAMAHA", "XTZ 250cc LANDER"), ("KTM", "ADVENTURE"), ("HONDA", "XR 250")]
+TIPOS_TRABAJO = ["MANTENIMIENTO", "REPARACIÓN", "SINIESTRO", "SERVICIO GENERAL"]
+ESTADOS_TALLER = ["INGRESADO", "EN REPARACIÓN", "FINALIZADO", "FINALIZADO", "FINALIZADO"]
+
+TEXTO = (
+    "CONSTE: en actuaciones que se tramitan en esta Unidad se llevó a cabo diligencia "
+    "de allanamiento ordenada por el Juez de Garantías, con intervención de la Fiscalía "
+    "Única de Cutral Co, arrojando los resultados que se detallan a continuación. "
+)
+
+
+def _fechas(rnd, n, desde=datetime(2025, 1, 1), dias=365):
+    return [desde + timedelta(days=rnd.randrange(dias), minutes=rnd.randrange(1440)) for _ in range(n)]
+
+
+def allanamientos(n, rnd):
+    resultado = [rnd.choice(["POSITIVO", "NEGATIVO"]) for _ in range(n)]
+    return pd.DataFrame({
+        "FECHA": _fechas(rnd, n),
+        "UNIDAD": [rnd.choice(UNIDADES) for _ in range(n)],
+        "OBSERVACIONES": [TEXTO * rnd.randint(2, 6) for _ in range(n)],
+        "SECUESTROS": "-",
+        "RESULTADO": resultado,
+        "DETALLE": None,
+        "POSITIVO ": [int(r == "POSITIVO") for r in resultado],
+        "NEGATIVOS": [int(r == "NEGATIVO") for r in resultado],
+    })
+
+
+def armas(n, rnd):
+    return pd.DataFrame({
+        "FECHA": _fechas(rnd, n),
+        "UNIDAD": [rnd.choice(UNIDADES) for _ in range(n)],
+        "OBSERVACIONES": [TEXTO * rnd.randint(2, 8) for _ in range(n)],
+        "INTERVENCION": [rnd.choice(["ALLANAMIENTO", "PROCEDIMIENTO", "REQUISA VEHICULAR"]) for _ in range(n)],
+        "TIPO": [rnd.choice(["ARMA DE  FUEGO", "CARTUCHERIA", "TUMBERA"]) for _ in range(n)],
+        "DETALLE": [rnd.choice(["TIPO CARABINA", "CAL 22", "COMPLETO", "REVOLVER"]) for _ in range(n)],
+        "CANTIDAD": [rnd.randint(1, 20) for _ in range(n)],
+    })
+
+
+def vehiculos(n, rnd, motos=False, jp_desde=1):
+    marcas = MARCAS_MOTO if motos else MARCAS
+    filas = []
+    for i in range(n):
+        marca, modelo = rnd.choice(marcas)
+        destino = rnd.choice(UNIDADES)
+        fila = {
+            "ORDEN N° ": i + 1,
+            "JP": jp_desde + i,
+            "DOMINIO": f"A{rnd.randrange(100, 999)}{chr(65 + i % 26)}{chr(65 + (i // 26) % 26)}{i}",
+            "MODELO": modelo,
+            "TIPO": "MOTOCICLETA" if motos else "SEDAN 4 PUERTAS",
+            "MARCA ": marca,
+            "AÑO": rnd.randint(2012, 2025),
+            "CHASIS": f"9BW{rnd.randrange(10**13, 10**14)}",
+            "MOTOR": f"M{rnd.randrange(10**8, 10**9)}",
+            "DESTINO": destino,
+            "DIRECCION": rnd.choice(DIRECCIONES),
+            "SITUACION ACTUAL": rnd.choice(SITUACIONES),
+            "OBSERVACIONES": "SIN NOVEDAD",
+            "OTRAS CAUSAS": None,
+        }
+        if not motos:
+            fila = {"UNIDAD": destino, **fila}
+        filas.append(fila)
+    return pd.DataFrame(filas)
+
+
+def taller(n, flota, rnd):
+    elegidos = flota.sample(n=n, replace=True, random_state=rnd.randrange(2**31))
+    ingresos = _fechas(rnd, n, desde=datetime.now() - timedelta(days=730), dias=730)
+    estados = [rnd.choice(ESTADOS_TALLER) for _ in range(n)]
+    return pd.DataFrame({
+        "FECHA_INGRESO": ingresos,
+        "FECHA_EGRESO": [f + timedelta(days=rnd.randint(1, 20)) if e == "FINALIZADO" else pd.NaT
+                         for f, e in zip(ingresos, estados)],
+        "UNIDAD": elegidos["UNIDAD"].to_numpy(),
+        "MOVIL": elegidos["JP"].astype(str).to_numpy(),
+        "TIPO_TRABAJO": [rnd.choice(TIPOS_TRABAJO) for _ in range(n)],
+        "DESCRIPCION": "TREN DELANTERO",
+        "TALLER": "TALLER POLICIAL",
+        "RESPONSABLE": "",
+        "ESTADO": estados,
+    })
+
+
+# ---------------------------------------------------------
+# ESCRITURA
+# ---------------------------------------------------------
+def escribir_dsicco(path, filas, rnd):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        pd.DataFrame([[None] * 18] * 6).to_excel(writer, sheet_name="ABRIL Y MAYO 2021", index=False)
+        allanamientos(filas, rnd).to_excel(writer, sheet_name="ALLANAMIENTOS", index=False)
+        armas(max(filas // 2, 1), rnd).to_excel(writer, sheet_name="ARMAS", index=False)
+        writer.book["ABRIL Y MAYO 2021"].sheet_state = "hidden"
+
+
+def escribir_moviles(path, filas, rnd):
+    flota = vehiculos(filas, rnd)
+    motos = vehiculos(max(filas // 2, 1), rnd, motos=True, jp_desde=filas + 1)
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        flota.to_excel(writer, sheet_name="FLOTA AUTOMOTRIZ", index=False)
+        motos.to_excel(writer, sheet_name="MOTOCICLETAS", index=False)
+    return flota
+
+
+def generar(carpeta, filas=1000, semilla=2025):
+    """Escribe DSICCO.xlsx, MOVILES.xlsx y TALLER_MOVILES.xlsx en `carpeta`.
+
+    `filas` es la cantidad de allanamientos; el resto escala a partir de ahí.
+    """
+    rnd = random.Random(semilla)
+    os.makedirs(carpeta, exist_ok=True)
+    escribir_dsicco(os.path.join(carpeta, "DSICCO.xlsx"), filas, rnd)
+    flota = escribir_moviles(os.path.join(carpeta, "MOVILES.xlsx"), max(filas // 10, 10), rnd)
+    taller(max(filas // 5, 5), flota, rnd).to_excel(
+        os.path.join(carpeta, "TALLER_MOVILES.xlsx"), index=False
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Genera planillas sintéticas de DSICCO")
+    parser.add_argument("carpeta")
+    parser.add_argument("--filas", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=2025)
+    args = parser.parse_args()
+    generar(args.carpeta, args.filas, args.semilla)
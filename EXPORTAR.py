@@ -0,0 +1,77 @@
+import io
+
+import streamlit as st
+
+# ---------------------------------------------------------
+# EXPORTACIÓN DE REGISTROS FILTRADOS (CSV / PARQUET)
+# ---------------------------------------------------------
+# Se entregan con st.download_button: el archivo se arma recién cuando el
+# usuario hace clic y Streamlit lo sirve desde memoria con una URL
+# aleatoria atada a la sesión. Los registros (allanamientos, armas,
+# flota) nunca se escriben en una carpeta pública como la de static
+# serving.
+#
+# Límite de memoria: el archivo se genera entero en memoria y Streamlit
+# guarda esa copia mientras el botón siga en la página, así que cada
+# sesión que exporta ocupa el tamaño del archivo (dos veces mientras se
+# genera). Con los volúmenes de estas planillas son pocos MB; para
+# exportar millones de filas habría que servir el archivo desde disco,
+# algo que download_button no permite.
+def parquet_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+# ---------------------------------------------------------
+# CONTENIDO DE CADA FORMATO
+# ---------------------------------------------------------
+def csv_bytes(df):
+    # BOM al principio para que Excel reconozca UTF-8 (acentos, Ñ)
+    return df.to_csv(index=False).encode("utf-8-sig")
+
+
+def parquet_bytes(df):
+    # Texto en todas las columnas object: columnas mezcladas no rompen el esquema
+    df = df.astype({c: "string" for c in df.columns if df[c].dtype == object})
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+FORMATOS = {
+    "CSV": (".csv", "text/csv", csv_bytes),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", parquet_bytes),
+}
+
+
+def formatos_disponibles():
+    return [f for f in FORMATOS if f != "Parquet" or parquet_disponible()]
+
+
+def nombre_archivo(*partes):
+    """Nombre de archivo seguro a partir de la página y los filtros aplicados."""
+    texto = "_".join(str(p) for p in partes if p not in (None, ""))
+    return "".join(c if c.isalnum() or c in "-_" else "_" for c in texto).strip("_") or "exportacion"
+
+
+# ---------------------------------------------------------
+# WIDGET DE DESCARGA
+# ---------------------------------------------------------
+def boton_exportar(df, nombre, key):
+    """Selector de formato y descarga de las filas de `df` (ya filtradas)."""
+    c1, c2 = st.columns([1, 3])
+    formato = c1.selectbox("Formato", formatos_disponibles(), key=f"{key}_formato")
+    extension, mime, generar = FORMATOS[formato]
+    archivo = f"{nombre}{extension}"
+    etiqueta = f"📤 Exportar {len(df)} filas ({formato})"
+
+    # Diferido: se genera al hacer clic, no en cada rerun de la página
+    def contenido():
+        return generar(df)
+
+    c2.download_button(etiqueta, data=contenido, file_name=archivo, mime=mime,
+                       key=f"{key}_descarga", on_click="ignore")
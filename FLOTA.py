@@ -0,0 +1,375 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+import COMPARTIDO
+import LECTOR
+import PARTICIONES
+
+# ---------------------------------------------------------
+# ESTADO INCREMENTAL DE LA FLOTA
+# ---------------------------------------------------------
+# Entre dos versiones de MOVILES.xlsx se comparan las filas por clave
+# (DOMINIO, o JP si falta) y por hash de contenido. Solo las altas,
+# bajas y cambios se aplican al estado guardado y a sus resúmenes, y
+# cada cambio se agrega a un registro de eventos que nunca se reescribe.
+# Las páginas y el tablero leen la flota con `cargar` y `cargar_indice`:
+# una sincronización por planilla y por proceso, compartida por sesiones.
+# Las particiones por DIRECCION de una versión nueva salen de la anterior:
+# solo se vuelven a partir las direcciones con filas que cambiaron.
+#
+# El estado guarda hasta qué byte del registro llegan sus eventos: si el
+# proceso se corta entre escribir los eventos y guardar el estado, la
+# próxima sincronización descarta esa cola y los vuelve a escribir una vez.
+UPLOAD_FOLDER = "uploads"
+ESTADO_FILE = os.path.join(UPLOAD_FOLDER, "flota_estado.pkl")
+EVENTOS_FILE = os.path.join(UPLOAD_FOLDER, "flota_eventos.jsonl")
+
+HOJAS = {"FLOTA": "FLOTA", "MOTOS": "MOTO"}
+COLUMNA_PARTICION = "DIRECCION"
+VACIOS = {"", "NAN", "NONE", "NAT"}
+# Numeración de filas y columnas sin encabezado: no describen al vehículo
+# (borrar una fila renumera todas las siguientes), no entran al hash ni al diff
+PRESENTACION = re.compile(r"^(ORDEN\b.*|N[°º]|NRO\.?|ITEM|UNNAMED: \d+)$")
+
+_LOCK = threading.Lock()
+_vigente = None  # último estado leído o guardado por este proceso
+
+
+def estado_icono(situacion):
+    return "🟢" if situacion == "EN SERVICIO" else "🔴" if situacion == "FUERA DE SERVICIO" else "🟡"
+
+
+# ---------------------------------------------------------
+# NORMALIZACIÓN Y CLAVES
+# ---------------------------------------------------------
+def canonico(texto):
+    """Texto comparable de una columna ya pasada a str.
+
+    Una celda vacía convierte una columna de enteros en float y "2015" pasa
+    a "2015.0" en todas las filas: los números enteros se escriben sin ".0"
+    y todos los vacíos (NaN, None, NaT) quedan como "NAN".
+    """
+    texto = texto.str.upper().str.strip().str.replace(r"^(-?\d+)\.0$", r"\1", regex=True)
+    return texto.replace({"NONE": "NAN", "NAT": "NAN"})
+
+
+def normalizar(df, hoja):
+    df = df.copy()
+    df.columns = df.columns.str.upper().str.strip()
+    for col in df.columns:
+        # Se fija el texto de los vacíos para que las comparaciones sean estables
+        df[col] = canonico(df[col].astype(str))
+
+    if "UNIDAD" in df.columns:
+        df["UNIDAD"] = df["UNIDAD"].replace({"": "SIN UNIDAD"}).fillna("SIN UNIDAD")
+    elif hoja == "MOTOS" and "DESTINO" in df.columns:
+        df["UNIDAD"] = df["DESTINO"].replace({"": "SIN UNIDAD"}).fillna("SIN UNIDAD")
+    else:
+        df["UNIDAD"] = "SIN UNIDAD"
+    return df
+
+
+def _claves(df):
+    dominio = df["DOMINIO"] if "DOMINIO" in df.columns else pd.Series("", index=df.index)
+    jp = df["JP"] if "JP" in df.columns else pd.Series("", index=df.index)
+    clave = dominio.where(~dominio.isin(VACIOS), "JP:" + jp)
+    # Claves repetidas en la planilla se distinguen por orden de aparición
+    n = clave.groupby(clave).cumcount()
+    return clave.where(n == 0, clave + "#" + (n + 1).astype(str))
+
+
+def indexar(df):
+    df = df.copy()
+    df.index = pd.Index(_claves(df), name="CLAVE")
+    return df
+
+
+def comparables(columnas):
+    return sorted(c for c in columnas if not PRESENTACION.match(c))
+
+
+def hashes(df, columnas):
+    return pd.util.hash_pandas_object(df.reindex(columns=columnas, fill_value="NAN"), index=False)
+
+
+def hojas_de_excel(excel):
+    hojas = {}
+    for nombre, df in excel.items():
+        upper = nombre.upper().strip()
+        for hoja, patron in HOJAS.items():
+            if hoja not in hojas and patron in upper:
+                hojas[hoja] = indexar(normalizar(df, hoja))
+    return hojas
+
+
+# ---------------------------------------------------------
+# DIFERENCIAS ENTRE VERSIONES
+# ---------------------------------------------------------
+def diferencias(anterior, nuevo):
+    """Compara dos hojas indexadas por CLAVE.
+
+    Devuelve un dict con las claves de `altas` y `bajas`, y en `cambios`
+    un dict clave -> {columna: (antes, después)}.
+    """
+    columnas = comparables(set(anterior.columns) | set(nuevo.columns))
+    altas = nuevo.index.difference(anterior.index)
+    bajas = anterior.index.difference(nuevo.index)
+    comunes = nuevo.index.intersection(anterior.index)
+
+    h_ant = hashes(anterior.loc[comunes], columnas)
+    h_nue = hashes(nuevo.loc[comunes], columnas)
+    distintas = comunes[h_ant.to_numpy() != h_nue.to_numpy()]
+
+    cambios = {}
+    if len(distintas):
+        a = anterior.loc[distintas].reindex(columns=columnas, fill_value="NAN")
+        b = nuevo.loc[distintas].reindex(columns=columnas, fill_value="NAN")
+        for clave in distintas:
+            fila_a, fila_b = a.loc[clave], b.loc[clave]
+            cambios[clave] = {c: (fila_a[c], fila_b[c]) for c in columnas if fila_a[c] != fila_b[c]}
+
+    return {"altas": list(altas), "bajas": list(bajas), "cambios": cambios}
+
+
+# ---------------------------------------------------------
+# ESTADO Y RESÚMENES
+# ---------------------------------------------------------
+def _situacion(df):
+    if "SITUACION ACTUAL" in df.columns:
+        return df["SITUACION ACTUAL"]
+    return pd.Series("", index=df.index)
+
+
+def _con_estado(df):
+    df = df.copy()
+    df["ESTADO"] = _situacion(df).map(estado_icono)
+    return df
+
+
+def _contar(df):
+    return df.groupby(["UNIDAD", _situacion(df).rename("SITUACION ACTUAL")]).size().to_dict()
+
+
+def _ajustar(resumen, df, signo):
+    for k, n in _contar(df).items():
+        resumen[k] = resumen.get(k, 0) + signo * n
+        if resumen[k] == 0:
+            del resumen[k]
+
+
+def servicio(conteos):
+    """(en servicio, fuera de servicio) a partir de conteos {(UNIDAD, SITUACION ACTUAL): n}."""
+    en_servicio = sum(n for (_, sit), n in conteos.items() if sit == "EN SERVICIO")
+    fuera_servicio = sum(n for (_, sit), n in conteos.items() if sit == "FUERA DE SERVICIO")
+    return en_servicio, fuera_servicio
+
+
+def resumir(hojas):
+    """Conteos {hoja: {(UNIDAD, SITUACION ACTUAL): n}} de una partición de la flota."""
+    return {hoja: _contar(df) for hoja, df in hojas.items()}
+
+
+def aplicar(hoja_estado, resumen, nuevo, dif):
+    """Aplica solo los deltas de `dif` a la hoja guardada y su resumen."""
+    tocadas = dif["altas"] + list(dif["cambios"])
+    salientes = dif["bajas"] + list(dif["cambios"])
+
+    _ajustar(resumen, hoja_estado.loc[salientes], -1)
+    entrantes = _con_estado(nuevo.loc[tocadas])
+    _ajustar(resumen, entrantes, +1)
+
+    hoja_estado = hoja_estado.drop(index=salientes)
+    hoja_estado = pd.concat([hoja_estado, entrantes])
+    # Se respeta el orden de la planilla nueva, con su numeración de filas
+    hoja_estado = hoja_estado.reindex(nuevo.index)
+    for col in nuevo.columns.difference(comparables(nuevo.columns)):
+        hoja_estado[col] = nuevo[col]
+    return hoja_estado
+
+
+def reubicadas(anterior, nuevo):
+    """Claves comunes a las dos hojas cuya numeración de fila cambió.
+
+    None si las filas comunes cambiaron de orden en la planilla.
+    """
+    comunes_a = anterior.index[anterior.index.isin(nuevo.index)]
+    comunes_n = nuevo.index[nuevo.index.isin(anterior.index)]
+    if not comunes_a.equals(comunes_n):
+        return None
+    presentacion = nuevo.columns.difference(comparables(nuevo.columns))
+    a = anterior.reindex(index=comunes_n, columns=presentacion, fill_value="NAN")
+    b = nuevo.loc[comunes_n, presentacion]
+    return list(comunes_n[(a != b).any(axis=1).to_numpy()])
+
+
+def _tocados(anterior, nuevo, dif):
+    """Valores de COLUMNA_PARTICION con filas distintas entre las dos hojas (None: todos)."""
+    movidas = reubicadas(anterior, nuevo)
+    if movidas is None:
+        return None
+    salientes = dif["bajas"] + list(dif["cambios"])
+    entrantes = dif["altas"] + list(dif["cambios"]) + movidas
+    return (
+        set(PARTICIONES.valores_fila(anterior.loc[salientes], COLUMNA_PARTICION))
+        | set(PARTICIONES.valores_fila(nuevo.loc[entrantes], COLUMNA_PARTICION))
+    )
+
+
+def _eventos(version, hoja, nuevo, anterior, dif):
+    fecha = datetime.now().isoformat(timespec="seconds")
+    base = {"fecha": fecha, "version": version, "hoja": hoja}
+    for clave in dif["altas"]:
+        fila = nuevo.loc[clave]
+        yield {**base, "clave": clave, "jp": fila.get("JP", ""), "tipo": "ALTA",
+               "campo": "SITUACION ACTUAL", "antes": None, "despues": fila.get("SITUACION ACTUAL", "")}
+    for clave in dif["bajas"]:
+        fila = anterior.loc[clave]
+        yield {**base, "clave": clave, "jp": fila.get("JP", ""), "tipo": "BAJA",
+               "campo": "SITUACION ACTUAL", "antes": fila.get("SITUACION ACTUAL", ""), "despues": None}
+    for clave, campos in dif["cambios"].items():
+        jp = nuevo.loc[clave].get("JP", "")
+        for campo, (antes, despues) in campos.items():
+            yield {**base, "clave": clave, "jp": jp, "tipo": "CAMBIO",
+                   "campo": campo, "antes": antes, "despues": despues}
+
+
+def _registrar_eventos(eventos, hasta):
+    """Agrega `eventos` después del byte `hasta` y devuelve el nuevo final.
+
+    Lo que haya más allá de `hasta` son eventos de una sincronización que
+    no llegó a guardar su estado: se descartan antes de escribir.
+    """
+    with open(EVENTOS_FILE, "ab") as f:
+        if hasta is not None and f.tell() > hasta:
+            f.truncate(hasta)
+            f.seek(hasta)
+        for ev in eventos:
+            f.write((json.dumps(ev, ensure_ascii=False) + "\n").encode("utf-8"))
+        return f.tell()
+
+
+def _leer_estado():
+    if not os.path.exists(ESTADO_FILE):
+        return None
+    try:
+        return pd.read_pickle(ESTADO_FILE)
+    except Exception:
+        return None
+
+
+def _guardar_estado(estado):
+    tmp = f"{ESTADO_FILE}.tmp"
+    pd.to_pickle(estado, tmp)
+    os.replace(tmp, ESTADO_FILE)
+
+
+def sincronizar(path):
+    """Lleva el estado guardado de la flota a la versión de `path`.
+
+    Si la planilla es la misma que la última sincronizada no se parsea.
+    Devuelve el estado: {"version", "hojas", "resumen", "ultimo_diff",
+    "particiones"}; "particiones" es la versión anterior y las direcciones
+    que cambiaron desde ella (ver `indice`).
+    """
+    global _vigente
+    with open(path, "rb") as f:
+        version = hashlib.sha256(f.read()).hexdigest()
+
+    with _LOCK:
+        # Misma versión que la última de este proceso: no se deserializa el estado
+        if _vigente is not None and _vigente["version"] == version:
+            return _vigente
+        estado = _leer_estado()
+        if estado is not None and estado["version"] == version:
+            _vigente = estado
+            return estado
+
+        # Todas las columnas: cualquier cambio en la planilla queda registrado
+        nuevas = hojas_de_excel(LECTOR.leer_hojas(path, {patron: None for patron in HOJAS.values()}))
+        if estado is None:
+            estado = {"version": None, "hojas": {}, "resumen": {}, "ultimo_diff": {}}
+
+        eventos = []
+        tocados = set()
+        for hoja in sorted(set(nuevas) | set(estado["hojas"])):
+            anterior = estado["hojas"].get(hoja)
+            nuevo = nuevas.get(hoja)
+            if anterior is None:
+                anterior = nuevo.iloc[0:0]
+            if nuevo is None:
+                nuevo = anterior.iloc[0:0].drop(columns="ESTADO")
+            resumen = estado["resumen"].setdefault(hoja, {})
+            # Estados guardados antes de `canonico` se comparan ya canónicos
+            guardada = anterior.drop(columns="ESTADO", errors="ignore")
+            guardada = guardada.apply(canonico)
+            dif = diferencias(guardada, nuevo)
+            if tocados is not None:
+                cambiados = _tocados(guardada, nuevo, dif)
+                tocados = None if cambiados is None else tocados | cambiados
+            estado["hojas"][hoja] = aplicar(anterior, resumen, nuevo, dif)
+            estado["ultimo_diff"][hoja] = {
+                "altas": len(dif["altas"]), "bajas": len(dif["bajas"]), "cambios": len(dif["cambios"])
+            }
+            eventos.extend(_eventos(version, hoja, nuevo, anterior, dif))
+
+        estado["particiones"] = {"base": _version_particion(estado["version"]), "tocados": tocados}
+        estado["version"] = version
+        estado["eventos_hasta"] = _registrar_eventos(eventos, estado.get("eventos_hasta"))
+        _guardar_estado(estado)
+        _vigente = estado
+        return estado
+
+
+def _version_particion(version):
+    return version[:16] if version else None
+
+
+def indice(path):
+    """Particiones por DIRECCION de la flota sincronizada con `path`.
+
+    Se derivan de las de la versión anterior con las direcciones que
+    cambiaron en la última sincronización.
+    """
+    estado = sincronizar(path)
+    deltas = estado.get("particiones", {})
+    return PARTICIONES.derivar(
+        "MOVILES", _version_particion(estado["version"]), COLUMNA_PARTICION, estado["hojas"], resumir,
+        base=deltas.get("base"), tocados=deltas.get("tocados"),
+    )
+
+
+# ---------------------------------------------------------
+# CARGA COMPARTIDA (MÓVILES, TABLERO)
+# ---------------------------------------------------------
+# La ruta es la del blob direccionado por contenido (ALMACEN.ruta_actual):
+# cambia solo con una planilla nueva.
+@COMPARTIDO.compartido("MOVILES")
+def cargar(path):
+    return sincronizar(path)
+
+
+@COMPARTIDO.compartido("MOVILES (índice por dirección)")
+def cargar_indice(path):
+    return indice(path)
+
+
+# ---------------------------------------------------------
+# CONSULTAS SOBRE EL REGISTRO DE EVENTOS
+# ---------------------------------------------------------
+def leer_eventos():
+    if not os.path.exists(EVENTOS_FILE):
+        return pd.DataFrame(columns=["fecha", "version", "hoja", "clave", "jp", "tipo", "campo", "antes", "despues"])
+    return pd.read_json(EVENTOS_FILE, lines=True, dtype=False)
+
+
+def historial_estado(clave):
+    """Historia de SITUACION ACTUAL, DESTINO y UNIDAD de un vehículo."""
+    ev = leer_eventos()
+    ev = ev[(ev["clave"] == clave) & ev["campo"].isin(["SITUACION ACTUAL", "DESTINO", "UNIDAD"])]
+    return ev[["fecha", "tipo", "campo", "antes", "despues"]].reset_index(drop=True)
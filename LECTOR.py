@@ -0,0 +1,118 @@
+import importlib.util
+import multiprocessing
+import os
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+import pandas as pd
+
+# ---------------------------------------------------------
+# LECTOR DE PLANILLAS XLSX
+# ---------------------------------------------------------
+# Cada página declara qué hojas y columnas necesita y de qué tipo, por
+# ejemplo:
+#     HOJAS = {"ARMAS": {"FECHA": "fecha", "TIPO": None, "CANTIDAD": "numero"}}
+# La clave de la hoja se compara con el nombre en mayúsculas: primero
+# exacta y si no por contenido ("FLOTA" encuentra "FLOTA AUTOMOTRIZ").
+# Un valor None en lugar del dict de columnas lee la hoja completa.
+# Se usa calamine si python-calamine está instalado (pip install
+# python-calamine); si no, openpyxl. DSICCO_MOTOR_XLSX=openpyxl fuerza
+# el motor. Con openpyxl y archivos grandes las hojas se parsean en un
+# pool de procesos: openpyxl es Python puro y con hilos no se gana nada.
+MOTORES = ("calamine", "openpyxl")
+UMBRAL_PROCESOS = 2_000_000  # bytes
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+_pool = None
+_lock_pool = threading.Lock()
+
+
+def motor_disponible():
+    elegido = os.environ.get("DSICCO_MOTOR_XLSX")
+    if elegido in MOTORES:
+        return elegido
+    if importlib.util.find_spec("python_calamine") is not None:
+        return "calamine"
+    return "openpyxl"
+
+
+def nombres_hojas(path):
+    """[(nombre, visible)] leyendo solo xl/workbook.xml, sin abrir las hojas."""
+    with zipfile.ZipFile(path) as z:
+        raiz = ElementTree.fromstring(z.read("xl/workbook.xml"))
+    return [
+        (h.get("name"), h.get("state", "visible") == "visible")
+        for h in raiz.iter(f"{_NS}sheet")
+    ]
+
+
+def _resolver(declaradas, disponibles):
+    elegidas = {}
+    for clave in declaradas:
+        exacta = [n for n, _ in disponibles if n.upper().strip() == clave]
+        parcial = [n for n, visible in disponibles if visible and clave in n.upper()]
+        nombre = (exacta or parcial or [None])[0]
+        if nombre is not None and nombre not in elegidas:
+            elegidas[nombre] = declaradas[clave]
+    return elegidas
+
+
+def _convertir(df, columnas):
+    normal = {str(c).upper().strip(): c for c in df.columns}
+    for col, tipo in columnas.items():
+        original = normal.get(col)
+        if original is None or tipo is None:
+            continue
+        if tipo == "fecha":
+            df[original] = pd.to_datetime(df[original], errors="coerce")
+        elif tipo == "numero":
+            df[original] = pd.to_numeric(df[original], errors="coerce")
+        elif tipo == "texto":
+            df[original] = df[original].astype(str)
+    return df
+
+
+def _leer_hoja(fuente, hoja, columnas, motor):
+    # `fuente` es una ruta (pool de procesos) o un pd.ExcelFile ya abierto
+    usecols = None
+    if columnas is not None:
+        pedidas = set(columnas)
+        usecols = lambda c: str(c).upper().strip() in pedidas
+    engine = None if isinstance(fuente, pd.ExcelFile) else motor
+    df = pd.read_excel(fuente, sheet_name=hoja, usecols=usecols, engine=engine)
+    return _convertir(df, columnas or {})
+
+
+def _pool_procesos():
+    global _pool
+    with _lock_pool:
+        if _pool is None:
+            # spawn: el servidor de Streamlit tiene hilos y fork no es seguro
+            _pool = ProcessPoolExecutor(
+                max_workers=min(4, os.cpu_count() or 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def leer_hojas(path, hojas, motor=None, paralelo=None):
+    """Lee solo las hojas y columnas declaradas en `hojas`.
+
+    Devuelve {nombre real de la hoja: DataFrame}, como
+    `pd.read_excel(..., sheet_name=None)`; las hojas no encontradas se omiten.
+    `paralelo=None` decide solo (openpyxl y archivo >= UMBRAL_PROCESOS).
+    """
+    motor = motor or motor_disponible()
+    elegidas = _resolver({k.upper().strip(): v for k, v in hojas.items()}, nombres_hojas(path))
+    if paralelo is None:
+        paralelo = motor == "openpyxl" and os.path.getsize(path) >= UMBRAL_PROCESOS
+    if not paralelo or len(elegidas) < 2:
+        # Un solo libro abierto para todas las hojas
+        with pd.ExcelFile(path, engine=motor) as libro:
+            return {h: _leer_hoja(libro, h, cols, motor) for h, cols in elegidas.items()}
+
+    pool = _pool_procesos()
+    futuros = {h: pool.submit(_leer_hoja, path, h, cols, motor) for h, cols in elegidas.items()}
+    return {h: f.result() for h, f in futuros.items()}
@@ -0,0 +1,85 @@
+import threading
+import uuid
+import weakref
+from collections import OrderedDict
+
+import streamlit as st
+
+# ---------------------------------------------------------
+# REGISTRO DE MEMORIA (SIN PANDAS)
+# ---------------------------------------------------------
+# COMPARTIDO anota acá los datasets compartidos y los bytes propios de
+# cada sesión; la página de configuración solo lee este registro. No
+# importa pandas ni numpy: la configuración no paga ese costo (ver
+# ARRANQUE y los imports perezosos de APP.py).
+_lock = threading.Lock()
+_datasets = {}  # nombre -> OrderedDict(version -> {"bytes", "raices"})
+_sesiones = weakref.WeakValueDictionary()  # id -> _Sesion (vive en st.session_state)
+
+
+# ---------------------------------------------------------
+# DATASETS COMPARTIDOS
+# ---------------------------------------------------------
+def registrar_dataset(nombre, version, total, raices, max_entries):
+    with _lock:
+        # Como la caché, se conservan las últimas `max_entries` versiones cargadas
+        versiones = _datasets.setdefault(nombre, OrderedDict())
+        versiones[version] = {"bytes": total, "raices": raices}
+        versiones.move_to_end(version)
+        while len(versiones) > max_entries:
+            versiones.popitem(last=False)
+
+
+def raices_compartidas():
+    """ids de los buffers de todos los datasets compartidos."""
+    with _lock:
+        return set().union(*(
+            d["raices"] for versiones in _datasets.values() for d in versiones.values()
+        ))
+
+
+# ---------------------------------------------------------
+# MEMORIA PROPIA DE CADA SESIÓN
+# ---------------------------------------------------------
+class _Sesion:
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self.bytes = {}
+
+
+def sesion():
+    """Registro de la sesión actual, o None fuera de una sesión."""
+    try:
+        actual = st.session_state.get("_memoria")
+        if actual is None:
+            actual = st.session_state["_memoria"] = _Sesion()
+    except Exception:
+        return None  # fuera de una sesión (precalentado, scripts)
+    with _lock:
+        _sesiones[actual.id] = actual
+    return actual
+
+
+# ---------------------------------------------------------
+# REPORTES (FILAS SIMPLES)
+# ---------------------------------------------------------
+def reporte_datasets():
+    with _lock:
+        return [
+            {"DATASET": n, "VERSIÓN": v, "MB": round(d["bytes"] / 1e6, 2)}
+            for n, versiones in _datasets.items()
+            for v, d in versiones.items()
+        ]
+
+
+def reporte_sesiones():
+    with _lock:
+        sesiones = list(_sesiones.values())
+    return [
+        {
+            "SESIÓN": s.id,
+            "MB PROPIOS": round(sum(s.bytes.values()) / 1e6, 2),
+            "DETALLE": ", ".join(f"{n}: {b / 1e6:.2f}" for n, b in sorted(s.bytes.items())),
+        }
+        for s in sesiones
+    ]
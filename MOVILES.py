@@ -2,6 +2,12 @@ import streamlit as st
 import pandas as pd
 import os
 
+import ALMACEN
+import COMPARTIDO
+import EXPORTAR
+import FLOTA
+import PARTICIONES
+
 # ---------------------------------------------------------
 # CABECERA (solo visual)
 # ---------------------------------------------------------
@@ -19,7 +25,12 @@ st.divider()
 # ---------------------------------------------------------
 UPLOAD_FOLDER = "uploads"
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-SAVED_FILE = os.path.join(UPLOAD_FOLDER, "MOVILES.xlsx")
+ARCHIVO = "MOVILES.xlsx"
+
+
+@COMPARTIDO.compartido("MOVILES (dirección)", max_entries=16)
+def cargar_direccion(path, direccion):
+    return PARTICIONES.cargar(FLOTA.cargar_indice(path), direccion)
 
 # ---------------------------------------------------------
 # SUBIR ARCHIVO NUEVO
@@ -27,58 +38,38 @@ SAVED_FILE = os.path.join(UPLOAD_FOLDER, "MOVILES.xlsx")
 uploaded = st.file_uploader("📂 Seleccioná archivo Excel de móviles", type=["xlsx"])
 
 if uploaded:
- with open(SAVED_FILE, "wb") as f:
-  f.write(uploaded.getvalue())
-  st.success("✔ Archivo cargado y reemplazado correctamente.")
+    # Solo la primera vez: el uploader conserva el archivo entre reruns
+    resultado = ALMACEN.guardar_upload_una_vez(
+        ARCHIVO, uploaded.getvalue(), uploaded.file_id, st.session_state
+    )
+    if resultado is not None:
+        if resultado[1]:
+            st.success("✔ Archivo cargado y reemplazado correctamente.")
+        else:
+            st.caption("El archivo subido es igual a la versión actual; no se reprocesa.")
 
 # ---------------------------------------------------------
 # CARGAR ARCHIVO EXISTENTE
 # ---------------------------------------------------------
-if not os.path.exists(SAVED_FILE):
+SAVED_FILE = ALMACEN.ruta_actual(ARCHIVO)
+
+if SAVED_FILE is None:
     st.warning("📁 Todavía no hay archivo cargado.")
-    excel = {}
+    estado_flota = None
 else:
     try:
-        excel = pd.read_excel(SAVED_FILE, sheet_name=None)
+        # FLOTA aplica únicamente las diferencias con la versión anterior
+        estado_flota = FLOTA.cargar(SAVED_FILE)
+        indice = FLOTA.cargar_indice(SAVED_FILE)
     except Exception as e:
         st.error(f"❌ Error al abrir el archivo guardado: {e}")
-        excel = {}
+        estado_flota = None
 
-if excel:
+if estado_flota:
     # ---------------------------------------------------------
-    # DETECTAR HOJAS
+    # HOJAS YA NORMALIZADAS (FLOTA / MOTOS)
     # ---------------------------------------------------------
-    hojas = {h.upper().strip(): h for h in excel.keys()}
-    flota_key = next((k for k in hojas if "FLOTA" in k), None)
-    motos_key = next((k for k in hojas if "MOTO" in k), None)
-
-    if flota_key and motos_key:
-        flota = excel[hojas[flota_key]].copy()
-        motos = excel[hojas[motos_key]].copy()
-
-        # ---------------------------------------------------------
-        # NORMALIZAR COLUMNAS
-        # ---------------------------------------------------------
-        for df in (flota, motos):
-            df.columns = df.columns.str.upper().str.strip()
-            for col in df.columns:
-                df[col] = df[col].astype(str).str.upper().str.strip()
-
-        # ---------------------------------------------------------
-        # AJUSTE COLUMNA UNIDAD
-        # ---------------------------------------------------------
-        if "UNIDAD" in flota.columns:
-            flota["UNIDAD"] = flota["UNIDAD"].replace({"": "SIN UNIDAD"}).fillna("SIN UNIDAD")
-        else:
-            flota["UNIDAD"] = "SIN UNIDAD"
-
-        if "UNIDAD" in motos.columns:
-            motos["UNIDAD"] = motos["UNIDAD"].replace({"": "SIN UNIDAD"}).fillna("SIN UNIDAD")
-        elif "DESTINO" in motos.columns:
-            motos["UNIDAD"] = motos["DESTINO"].replace({"": "SIN UNIDAD"}).fillna("SIN UNIDAD")
-        else:
-            motos["UNIDAD"] = "SIN UNIDAD"
-
+    if "FLOTA" in indice["columnas"] and "MOTOS" in indice["columnas"]:
         # ---------------------------------------------------------
         # FILTROS
         # ---------------------------------------------------------
@@ -89,34 +80,54 @@ if excel:
                 return sorted(df[col_name].dropna().unique())
             return []
 
+        c1, c2 = st.columns(2)
+        with c2:
+            # Con ?direccion=<DIRECCION> en la URL la página queda fija en esa dirección
+            direccion = PARTICIONES.selector_alcance("DIRECCIÓN", PARTICIONES.valores(indice), "direccion")
+
+        # Una dirección carga solo su partición; TODAS usa la flota provincial compartida
+        if direccion == "TODAS":
+            hojas = estado_flota["hojas"]
+            alcance = None
+        else:
+            hojas = cargar_direccion(SAVED_FILE, direccion)
+            alcance = direccion
+        flota = hojas["FLOTA"].reset_index()
+        motos = hojas["MOTOS"].reset_index()
+
         destinos = sorted(set(
             valores_filtro(flota, "DESTINO") + valores_filtro(motos, "DESTINO") +
             valores_filtro(flota, "UNIDAD") + valores_filtro(motos, "UNIDAD")
         ))
-        direcciones = sorted(set(valores_filtro(flota, "DIRECCION") + valores_filtro(motos, "DIRECCION")))
-
-        c1, c2 = st.columns(2)
         with c1:
             destino = st.selectbox("DESTINO", ["TODOS"] + destinos)
-        with c2:
-            direccion = st.selectbox("DIRECCIÓN", ["TODAS"] + direcciones)
+
+        # Conteos precalculados de la dirección (o suma de todas)
+        conteos = PARTICIONES.resumen(indice, alcance)
+        flota_en, flota_fuera = FLOTA.servicio(conteos.get("FLOTA", {}))
+        motos_en, motos_fuera = FLOTA.servicio(conteos.get("MOTOS", {}))
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("🚓 En servicio", flota_en)
+        m2.metric("🚓 Fuera de servicio", flota_fuera)
+        m3.metric("🏍️ En servicio", motos_en)
+        m4.metric("🏍️ Fuera de servicio", motos_fuera)
 
         # ---------------------------------------------------------
         # APLICAR FILTROS
         # ---------------------------------------------------------
         def aplicar_filtros(df):
-            df_filtered = df.copy()
+            # Sin copia: filtrar devuelve un DataFrame nuevo y Copy-on-Write protege al compartido
+            df_filtered = df
             if destino != "TODOS":
                 if "DESTINO" in df_filtered.columns:
                     df_filtered = df_filtered[df_filtered["DESTINO"] == destino]
                 elif "UNIDAD" in df_filtered.columns:
                     df_filtered = df_filtered[df_filtered["UNIDAD"] == destino]
-            if direccion != "TODAS" and "DIRECCION" in df_filtered.columns:
-                df_filtered = df_filtered[df_filtered["DIRECCION"] == direccion]
             return df_filtered
 
         flota_filtrada = aplicar_filtros(flota)
         motos_filtrada = aplicar_filtros(motos)
+        COMPARTIDO.contar("moviles filtrados", [flota_filtrada, motos_filtrada])
 
         # ---------------------------------------------------------
         # RESUMEN MOVILES
@@ -124,8 +135,7 @@ if excel:
         def resumen_movil(df):
             if "SITUACION ACTUAL" not in df.columns:
                 return pd.DataFrame(columns=["UNIDAD","JP","ESTADO"])
-            df["SITUACION ACTUAL"] = df["SITUACION ACTUAL"].astype(str).str.upper().str.strip()
-            df["ESTADO"] = df["SITUACION ACTUAL"].apply(lambda x: "🟢" if x=="EN SERVICIO" else "🔴" if x=="FUERA DE SERVICIO" else "🟡")
+            # ESTADO viene calculado por FLOTA solo para las filas que cambiaron
             return df[["UNIDAD","JP","ESTADO"]]
 
         resumen_flota = resumen_movil(flota_filtrada)
@@ -151,5 +161,37 @@ if excel:
                     st.table(df_u[["JP","ESTADO"]])
         else:
             st.info("No hay datos de motos para mostrar")
+
+        # ---------------------------------------------------------
+        # EXPORTAR FILAS FILTRADAS
+        # ---------------------------------------------------------
+        st.subheader("📤 Exportar filas filtradas")
+        hoja_exportar = st.radio("Hoja", ["FLOTA", "MOTOS"], horizontal=True, key="moviles_hoja_exportar")
+        filas_exportar = flota_filtrada if hoja_exportar == "FLOTA" else motos_filtrada
+        EXPORTAR.boton_exportar(
+            filas_exportar.drop(columns=["CLAVE"]),
+            EXPORTAR.nombre_archivo(hoja_exportar, destino, direccion),
+            key="moviles_exportar",
+        )
+
+        # ---------------------------------------------------------
+        # HISTORIAL DE ESTADO POR MÓVIL
+        # ---------------------------------------------------------
+        st.subheader("🕒 Historial de estado")
+        ultimo = estado_flota["ultimo_diff"]
+        st.caption(" · ".join(
+            f"{hoja}: {d['altas']} altas, {d['bajas']} bajas, {d['cambios']} cambios"
+            for hoja, d in ultimo.items()
+        ) + " (última versión cargada)")
+
+        vehiculos = pd.concat([flota, motos])
+        etiquetas = dict(zip(vehiculos["CLAVE"], "JP " + vehiculos["JP"] + " – " + vehiculos["CLAVE"]))
+        clave = st.selectbox("Móvil", [""] + sorted(etiquetas), format_func=lambda k: etiquetas.get(k, "—"))
+        if clave:
+            hist = FLOTA.historial_estado(clave)
+            if hist.empty:
+                st.info("Sin cambios registrados para este móvil")
+            else:
+                st.table(hist)
     else:
         st.error("❌ El archivo debe contener hojas de FLOTA y MOTOCICLETAS.")
@@ -0,0 +1,211 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+
+import pandas as pd
+import streamlit as st
+
+# ---------------------------------------------------------
+# PARTICIONES POR DEPENDENCIA (DIRECCIÓN / UNIDAD)
+# ---------------------------------------------------------
+# Cada versión de una planilla se parte una sola vez por el valor de una
+# columna (DIRECCION en MOVILES, UNIDAD en DSICCO) y queda en disco:
+#     uploads/.particiones/<dataset>/<version>/indice.pkl
+#     uploads/.particiones/<dataset>/<version>/<n>.pkl   {hoja: DataFrame}
+# El índice guarda, por partición, sus filas por hoja y su resumen (lo que
+# devuelve `resumir` con las filas de esa partición). Una vista acotada a
+# una dependencia carga solo su archivo y su resumen; la provincial suma
+# los resúmenes de todas con `resumen(indice)` sin tocar las filas.
+# `derivar` arma una versión a partir de la anterior cuando se sabe qué
+# valores cambiaron (la flota, por sus diferencias): el resto de las
+# particiones reutiliza el archivo y el resumen ya guardados.
+PARTICIONES_FOLDER = os.path.join("uploads", ".particiones")
+SIN_VALOR = "SIN DATO"
+VERSIONES_GUARDADAS = 2
+
+_lock = threading.Lock()
+
+
+def version_de(path, variante=""):
+    # `variante`: qué se lee de la planilla; si cambia, se vuelve a partir
+    info = os.stat(path)
+    firma = f"{os.path.abspath(path)}|{info.st_mtime_ns}|{info.st_size}|{variante}"
+    return hashlib.sha1(firma.encode("utf-8")).hexdigest()[:16]
+
+
+# ---------------------------------------------------------
+# CONSTRUCCIÓN (UNA VEZ POR VERSIÓN)
+# ---------------------------------------------------------
+def valores_fila(df, columna):
+    """Valor de partición de cada fila de `df` (vacíos como SIN_VALOR)."""
+    if columna not in df.columns:
+        return pd.Series(SIN_VALOR, index=df.index)
+    return df[columna].where(df[columna].notna(), SIN_VALOR).astype(str)
+
+
+def _guardar(path, datos):
+    with open(path, "wb") as f:
+        pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _reutilizar(origen, destino):
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copyfile(origen, destino)
+
+
+def _construir(carpeta, hojas, columna, resumir, base=None, tocados=()):
+    tmp = f"{carpeta}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columnas = {hoja: list(df.columns) for hoja, df in hojas.items()}
+    # Con otras columnas las particiones guardadas no sirven: se parte todo
+    previas = base["particiones"] if base is not None and base["columnas"] == columnas else {}
+
+    posiciones = {hoja: df.groupby(valores_fila(df, columna), sort=False).indices for hoja, df in hojas.items()}
+    valores = sorted(set().union(*posiciones.values()))
+    particiones = {}
+    for n, valor in enumerate(valores):
+        archivo = f"{n}.pkl"
+        previa = previas.get(valor)
+        if previa is not None and valor not in tocados:
+            _reutilizar(os.path.join(base["carpeta"], previa["archivo"]), os.path.join(tmp, archivo))
+            particiones[valor] = {**previa, "archivo": archivo}
+            continue
+        parte = {
+            hoja: df.iloc[posiciones[hoja].get(valor, [])]
+            for hoja, df in hojas.items()
+        }
+        _guardar(os.path.join(tmp, archivo), parte)
+        particiones[valor] = {
+            "archivo": archivo,
+            "filas": {hoja: len(df) for hoja, df in parte.items()},
+            "resumen": resumir(parte) if resumir else None,
+        }
+
+    _guardar(os.path.join(tmp, "indice.pkl"), {
+        "columna": columna,
+        "columnas": columnas,
+        "particiones": particiones,
+    })
+    try:
+        os.rename(tmp, carpeta)
+    except OSError:
+        # Otro proceso la construyó primero
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _limpiar(carpeta_dataset):
+    versiones = sorted(
+        (os.path.join(carpeta_dataset, v) for v in os.listdir(carpeta_dataset) if not v.endswith(".tmp")),
+        key=os.path.getmtime, reverse=True,
+    )
+    for vieja in versiones[VERSIONES_GUARDADAS:]:
+        shutil.rmtree(vieja, ignore_errors=True)
+
+
+def _carpeta(dataset, version):
+    return os.path.join(PARTICIONES_FOLDER, dataset, version)
+
+
+def _abrir(carpeta):
+    with open(os.path.join(carpeta, "indice.pkl"), "rb") as f:
+        indice = pickle.load(f)
+    indice["carpeta"] = carpeta
+    return indice
+
+
+def _partir(dataset, version, construir):
+    carpeta = _carpeta(dataset, version)
+    with _lock:
+        if not os.path.exists(os.path.join(carpeta, "indice.pkl")):
+            os.makedirs(os.path.dirname(carpeta), exist_ok=True)
+            construir(carpeta)
+            _limpiar(os.path.dirname(carpeta))
+    return _abrir(carpeta)
+
+
+def particiones(dataset, path, columna, leer, resumir=None, variante=""):
+    """Índice de particiones de la versión actual de `path`.
+
+    La primera vez por versión lee las hojas con `leer(path)` ({hoja:
+    DataFrame}), las parte por `columna` y guarda `resumir(parte)` de cada
+    una (None si no hay `resumir`).
+    """
+    return _partir(
+        dataset, version_de(path, variante),
+        lambda carpeta: _construir(carpeta, leer(path), columna, resumir),
+    )
+
+
+def derivar(dataset, version, columna, hojas, resumir, base=None, tocados=None):
+    """Índice de `hojas` como versión `version`, partiendo solo lo que cambió.
+
+    `base` es la versión anterior y `tocados` los valores de `columna` cuyas
+    filas cambiaron desde entonces: las demás particiones se toman de
+    `base`. Sin `tocados` (None) o si `base` ya no está en disco se parte todo.
+    """
+    def construir(carpeta):
+        anterior = None
+        if base is not None and tocados is not None and os.path.exists(os.path.join(_carpeta(dataset, base), "indice.pkl")):
+            anterior = _abrir(_carpeta(dataset, base))
+        _construir(carpeta, hojas, columna, resumir, anterior, tocados or ())
+
+    return _partir(dataset, version, construir)
+
+
+# ---------------------------------------------------------
+# CONSULTAS
+# ---------------------------------------------------------
+def valores(indice):
+    return list(indice["particiones"])
+
+
+def cargar(indice, valor):
+    """{hoja: DataFrame} con las filas de una sola partición."""
+    with open(os.path.join(indice["carpeta"], indice["particiones"][valor]["archivo"]), "rb") as f:
+        return pickle.load(f)
+
+
+def filtrar(hojas, columna, valor):
+    """{hoja: filas de `valor`} de hojas sin partir, con el mismo criterio que las particiones."""
+    return {hoja: df[(valores_fila(df, columna) == valor).to_numpy()] for hoja, df in hojas.items()}
+
+
+def sumar(resumenes):
+    """Suma resúmenes: DataFrames se concatenan, dicts se suman por clave, números se suman."""
+    resumenes = list(resumenes)
+    if not resumenes:
+        return {}
+    primero = resumenes[0]
+    if isinstance(primero, pd.DataFrame):
+        return pd.concat(resumenes, ignore_index=True)
+    if isinstance(primero, dict):
+        claves = dict.fromkeys(k for r in resumenes for k in r)
+        return {k: sumar(r[k] for r in resumenes if k in r) for k in claves}
+    return sum(resumenes)
+
+
+def resumen(indice, valor=None):
+    """Resumen de una partición o, con `valor=None`, el provincial."""
+    if valor is not None:
+        return indice["particiones"][valor]["resumen"]
+    return sumar(p["resumen"] for p in indice["particiones"].values())
+
+
+# ---------------------------------------------------------
+# ALCANCE DE LA VISTA
+# ---------------------------------------------------------
+def selector_alcance(etiqueta, opciones, parametro, todas="TODAS", key=None):
+    """Selectbox de dependencia. Con ?<parametro>=<valor> en la URL la vista
+    queda fija en esa partición (enlace para una dependencia)."""
+    pedido = str(st.query_params.get(parametro, "")).upper().strip()
+    fijo = next((o for o in opciones if str(o).upper().strip() == pedido), None) if pedido else None
+    if fijo is not None:
+        st.selectbox(etiqueta, [fijo], disabled=True, key=key)
+        return fijo
+    return st.selectbox(etiqueta, [todas] + list(opciones), key=key)
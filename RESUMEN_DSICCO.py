@@ -0,0 +1,116 @@
+import pandas as pd
+
+import COMPARTIDO
+import LECTOR
+import PARTICIONES
+
+# ---------------------------------------------------------
+# RESÚMENES DE DSICCO POR PARTICIÓN (UNIDAD)
+# ---------------------------------------------------------
+# Las particiones se arman solo con las columnas declaradas en HOJAS y
+# `resumir` calcula los conteos de cada una: por mes y unidad para la
+# página de allanamientos y los totales del tablero. Como cada UNIDAD cae
+# en una sola partición, el resumen provincial es la concatenación / suma
+# de los resúmenes (PARTICIONES.resumen). Las hojas completas (con
+# OBSERVACIONES, DETALLE...) son solo para exportar filas: también se
+# parten por UNIDAD (`indice_completo`, sin resumen), así una vista de
+# una unidad lee solo sus filas; la provincial lee las hojas enteras.
+HOJAS = {
+    "ALLANAMIENTOS": {"FECHA": "fecha", "UNIDAD": None, "RESULTADO": None},
+    "ARMAS": {"FECHA": "fecha", "UNIDAD": None, "INTERVENCION": None, "TIPO": None, "CANTIDAD": "numero"},
+}
+COMPLETAS = {"ALLANAMIENTOS": None, "ARMAS": None}
+
+
+def leer(path, hojas=HOJAS):
+    hojas = LECTOR.leer_hojas(path, hojas)
+    registros = {}
+    for nombre, df in hojas.items():
+        df.columns = df.columns.astype(str).str.upper().str.strip()
+        if "FECHA" in df.columns:
+            df["FECHA"] = pd.to_datetime(df["FECHA"], errors="coerce")
+        registros["ARMAS" if "ARMAS" in nombre.upper() else "ALLANAMIENTOS"] = df
+    return registros
+
+
+def _mes(df):
+    return pd.to_datetime(df["FECHA"], errors="coerce").dt.month.fillna(0).astype(int)
+
+
+def resumir(hojas):
+    # Columnas faltantes quedan vacías: la página avisa con indice["columnas"]
+    allan = hojas.get("ALLANAMIENTOS", pd.DataFrame()).reindex(columns=list(HOJAS["ALLANAMIENTOS"]))
+    armas = hojas.get("ARMAS", pd.DataFrame()).reindex(columns=list(HOJAS["ARMAS"]))
+
+    resultado = allan["RESULTADO"].astype(str).str.upper()
+    flags = pd.DataFrame({
+        "MES": _mes(allan),
+        "UNIDAD": allan["UNIDAD"],
+        "POSITIVO_FLAG": resultado.str.contains("POS", na=False),
+        "NEGATIVO_FLAG": resultado.str.contains("NEG", na=False),
+        "CANTIDAD": 1,
+    })
+    resumen_allan = (
+        flags.groupby(["MES", "UNIDAD"], as_index=False)
+        .agg({"POSITIVO_FLAG": "sum", "NEGATIVO_FLAG": "sum", "CANTIDAD": "sum"})
+    )
+
+    tipo = armas["TIPO"].astype(str).str.upper()
+    fuego = tipo.str.contains("ARMA|TUMBERA", regex=True, na=False)
+    cantidad = pd.to_numeric(armas["CANTIDAD"], errors="coerce")
+    validas = pd.DataFrame({
+        "MES": _mes(armas),
+        "UNIDAD": armas["UNIDAD"],
+        "INTERVENCION": armas["INTERVENCION"],
+        # En la página una cantidad vacía cuenta como 1 arma
+        "CANTIDAD": cantidad.fillna(1).astype(int),
+    })[fuego.to_numpy()]
+    resumen_armas = (
+        validas.groupby(["MES", "UNIDAD", "INTERVENCION"], as_index=False)
+        .agg({"CANTIDAD": "sum"})
+    )
+
+    return {
+        "ALLANAMIENTOS": resumen_allan,
+        "ARMAS": resumen_armas,
+        "TOTALES": {
+            "positivos": int(flags["POSITIVO_FLAG"].sum()),
+            "negativos": int(flags["NEGATIVO_FLAG"].sum()),
+            "allanamientos": len(allan),
+            # En el tablero las cantidades vacías no suman
+            "armas_fuego": int(cantidad[fuego].sum()),
+            "cartucheria": int(cantidad[tipo.str.contains("CARTUCHERIA", regex=True, na=False)].sum()),
+        },
+    }
+
+
+def indice(path):
+    """Particiones por UNIDAD de la versión actual de `path` (se arman una vez)."""
+    return PARTICIONES.particiones("DSICCO", path, "UNIDAD", leer, resumir, variante=repr(HOJAS))
+
+
+def indice_completo(path):
+    """Particiones por UNIDAD de las hojas completas de `path`, sin resumen."""
+    return PARTICIONES.particiones(
+        "DSICCO_COMPLETAS", path, "UNIDAD", lambda p: leer(p, COMPLETAS), variante=repr(COMPLETAS)
+    )
+
+
+# ---------------------------------------------------------
+# CARGA COMPARTIDA (ALLANAMIENTOS, TABLERO)
+# ---------------------------------------------------------
+# La ruta es la del blob direccionado por contenido (ALMACEN.ruta_actual):
+# cambia solo con una planilla nueva.
+@COMPARTIDO.compartido("DSICCO (índice por unidad)")
+def cargar_indice(path):
+    return indice(path)
+
+
+@COMPARTIDO.compartido("DSICCO (índice de hojas completas)")
+def cargar_indice_completo(path):
+    return indice_completo(path)
+
+
+@COMPARTIDO.compartido("DSICCO (hojas completas)", max_entries=1)
+def cargar_completas(path):
+    return leer(path, COMPLETAS)
@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import TALLER_INDICES
+
+# ---------------------------------------------------------
+# OPERACIONES EN LOTE DEL TALLER
+# ---------------------------------------------------------
+# Ingreso de muchos móviles y cambios de estado de muchas órdenes con
+# una sola escritura de TALLER_MOVILES.xlsx (archivo temporal + rename)
+# y una sola actualización de los índices. Los móviles que ya tienen una
+# orden activa se detectan con indices["activos"] de TALLER_INDICES, sin
+# recorrer el historial por cada móvil. El lock serializa los lotes de
+# todas las sesiones del proceso: `cargar()` se llama con el lock tomado
+# y ve siempre el último lote confirmado.
+CLAVE_ORDEN = ["UNIDAD", "MOVIL", "FECHA_INGRESO"]
+_LOCK = threading.Lock()
+
+
+# ---------------------------------------------------------
+# SELECCIÓN DE MÓVILES
+# ---------------------------------------------------------
+def parsear_jps(texto):
+    """JP únicos en el orden en que aparecen en un texto pegado (cualquier separador)."""
+    return list(dict.fromkeys(str(int(n)) for n in re.findall(r"\d+", texto or "")))
+
+
+def seleccionar(moviles, unidades=None, marca=None, modelos=None, jps=None):
+    """Móviles que cumplen todos los criterios dados (los vacíos no filtran).
+
+    Sin ningún criterio no devuelve nada: un lote nunca es toda la flota por omisión.
+    """
+    if not (unidades or marca or modelos or jps is not None):
+        return moviles.iloc[:0]
+    filtro = np.ones(len(moviles), dtype=bool)
+    if unidades:
+        filtro &= moviles["UNIDAD"].isin(unidades).to_numpy()
+    if marca:
+        filtro &= (moviles["MARCA"] == marca).to_numpy()
+    if modelos:
+        filtro &= moviles["MODELO"].isin(modelos).to_numpy()
+    if jps is not None:
+        filtro &= moviles["JP"].isin(jps).to_numpy()
+    return moviles[filtro].drop_duplicates(["UNIDAD", "JP"])
+
+
+def conflictos(indices, vehiculos):
+    """(unidad, movil) de `vehiculos` que ya tienen una orden activa."""
+    return [
+        (u, m) for u, m in zip(vehiculos["UNIDAD"], vehiculos["JP"])
+        if TALLER_INDICES.activo(indices, u, m)
+    ]
+
+
+# ---------------------------------------------------------
+# ESCRITURA EN UNA SOLA OPERACIÓN
+# ---------------------------------------------------------
+def _escribir(df_taller, taller_file):
+    base, extension = os.path.splitext(taller_file)
+    tmp = f"{base}.tmp{extension}"
+    df_taller.to_excel(tmp, index=False)
+    os.replace(tmp, taller_file)
+
+
+def ingresar(taller_file, cargar, vehiculos, tipo, taller, descripcion, fecha=None):
+    """Ingresa los `vehiculos` (UNIDAD, JP) que no tengan una orden activa.
+
+    `cargar()` devuelve (df_taller, indices) vigentes. Devuelve
+    (ingresados, omitidos), ambos como listas de (unidad, movil).
+    """
+    fecha = fecha or datetime.now()
+    with _LOCK:
+        df_taller, indices = cargar()
+        omitidos = set(conflictos(indices, vehiculos))
+        claves = [
+            c for c in dict.fromkeys(zip(vehiculos["UNIDAD"], vehiculos["JP"]))
+            if c not in omitidos
+        ]
+        if not claves:
+            return [], sorted(omitidos)
+
+        nuevas = pd.DataFrame({
+            "FECHA_INGRESO": fecha,
+            "FECHA_EGRESO": pd.NaT,
+            "UNIDAD": [u for u, _ in claves],
+            "MOVIL": [m for _, m in claves],
+            "TIPO_TRABAJO": tipo,
+            "DESCRIPCION": descripcion.upper(),
+            "TALLER": taller,
+            "RESPONSABLE": "",
+            "ESTADO": "INGRESADO",
+        }, columns=TALLER_INDICES.COLUMNAS)
+        # Con los dtypes del historial: FECHA_EGRESO (toda NaT) no queda como object
+        nuevas = nuevas.astype({c: t for c, t in df_taller.dtypes.items() if c in nuevas.columns})
+        _escribir(pd.concat([df_taller, nuevas], ignore_index=True), taller_file)
+
+        for unidad, movil in claves:
+            TALLER_INDICES.registrar_ingreso(indices, unidad, movil, fecha)
+        TALLER_INDICES.guardar(indices, taller_file)
+    return claves, sorted(omitidos)
+
+
+def _posiciones(df_taller, cambios):
+    """Posición en df_taller de cada orden de `cambios` (-1 si no está).
+
+    Las tablas del taller conservan el índice de df_taller: se usa esa fila
+    si su clave coincide. Si no (el archivo cambió desde que se mostró la
+    tabla), se busca la clave en el índice de órdenes; ante claves
+    repetidas vale la primera.
+    """
+    claves = pd.MultiIndex.from_frame(df_taller[CLAVE_ORDEN])
+    buscadas = pd.MultiIndex.from_frame(cambios[CLAVE_ORDEN])
+
+    posiciones = df_taller.index.get_indexer(cambios.index)
+    propias = posiciones >= 0
+    propias[propias] = claves[posiciones[propias]].to_numpy() == buscadas[propias].to_numpy()
+
+    primeras = ~claves.duplicated()
+    por_clave = claves[primeras].get_indexer(buscadas[~propias])
+    posiciones[~propias] = np.where(por_clave >= 0, np.flatnonzero(primeras)[por_clave], -1)
+    return posiciones
+
+
+def actualizar(taller_file, cargar, cambios, fecha=None):
+    """Aplica ESTADO (y RESPONSABLE, si viene) de `cambios` a las órdenes
+    que identifican sus columnas UNIDAD, MOVIL y FECHA_INGRESO.
+
+    Devuelve la cantidad de órdenes encontradas y actualizadas.
+    """
+    fecha = fecha or datetime.now()
+    with _LOCK:
+        df_taller, indices = cargar()
+
+        posiciones = _posiciones(df_taller, cambios)
+        encontradas = posiciones >= 0
+        if not encontradas.any():
+            return 0
+
+        filas = df_taller.index[posiciones[encontradas]]
+        antes = df_taller.loc[filas, "ESTADO"].to_numpy()
+        despues = cambios["ESTADO"].to_numpy()[encontradas]
+        cierran = (despues == "FINALIZADO") & df_taller.loc[filas, "FECHA_EGRESO"].isna().to_numpy()
+
+        df_taller.loc[filas[cierran], "FECHA_EGRESO"] = fecha
+        df_taller.loc[filas, "ESTADO"] = despues
+        if "RESPONSABLE" in cambios.columns:
+            df_taller.loc[filas, "RESPONSABLE"] = cambios["RESPONSABLE"].to_numpy()[encontradas]
+        _escribir(df_taller, taller_file)
+
+        unidades = df_taller.loc[filas, "UNIDAD"].to_numpy()
+        moviles = df_taller.loc[filas, "MOVIL"].to_numpy()
+        for a, d, u, m in zip(antes, despues, unidades, moviles):
+            TALLER_INDICES.registrar_transicion(indices, a, d, (u, m))
+        TALLER_INDICES.guardar(indices, taller_file)
+    return len(filas)
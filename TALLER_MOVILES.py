@@ -1,10 +1,16 @@
 import streamlit as st
 import pandas as pd
 import os
-from datetime import datetime
+
+import ALMACEN
+import COMPARTIDO
+import EXPORTAR
+import LECTOR
+import TALLER_INDICES
+import TALLER_LOTES
 
 UPLOADS = "uploads"
-MOVILES_FILE = os.path.join(UPLOADS, "MOVILES.xlsx")
+MOVILES_FILE = ALMACEN.ruta_actual("MOVILES.xlsx")
 TALLER_FILE = os.path.join(UPLOADS, "TALLER_MOVILES.xlsx")
 
 st.set_page_config(page_title="Taller de Móviles", layout="wide")
@@ -24,102 +30,194 @@ st.divider()
 # -------------------------------------------------
 # VALIDACIONES
 # -------------------------------------------------
-if not os.path.exists(MOVILES_FILE):
+if MOVILES_FILE is None:
     st.error("❌ No existe MOVILES.xlsx")
     st.stop()
 
 # -------------------------------------------------
-# CARGA MOVILES
+# CARGA (CACHEADA POR VERSIÓN DE ARCHIVO)
 # -------------------------------------------------
-excel = pd.read_excel(MOVILES_FILE, sheet_name=None)
-moviles = pd.DataFrame()
+# Cada fragmento lee de estas cachés: una interacción local no vuelve
+# a abrir los Excel, solo un guardado (que cambia el mtime) los invalida.
+def version_archivo(path):
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else 0
 
-for _, df in excel.items():
-    df.columns = df.columns.str.upper().str.strip()
-    if {"UNIDAD", "JP"}.issubset(df.columns):
-        moviles = pd.concat([moviles, df[["UNIDAD", "JP"]]])
 
-moviles["JP"] = pd.to_numeric(moviles["JP"], errors="coerce").dropna().astype(int).astype(str)
-moviles["UNIDAD"] = moviles["UNIDAD"].astype(str).str.upper()
+@COMPARTIDO.compartido("MOVILES (taller)")
+def cargar_moviles(path, version):
+    columnas = ["UNIDAD", "JP", "MARCA", "MODELO"]
+    excel = LECTOR.leer_hojas(path, {
+        "FLOTA": {c: None for c in columnas},
+        "MOTO": {c: None for c in columnas},
+    })
+    moviles = pd.DataFrame()
 
-# -------------------------------------------------
-# CARGA TALLER
-# -------------------------------------------------
-if os.path.exists(TALLER_FILE):
-    df_taller = pd.read_excel(TALLER_FILE)
-else:
-    df_taller = pd.DataFrame(columns=[
-        "FECHA_INGRESO","FECHA_EGRESO","UNIDAD","MOVIL",
-        "TIPO_TRABAJO","DESCRIPCION","TALLER","RESPONSABLE","ESTADO"
-    ])
+    for _, df in excel.items():
+        df.columns = df.columns.str.upper().str.strip()
+        if {"UNIDAD", "JP"}.issubset(df.columns):
+            moviles = pd.concat([moviles, df.reindex(columns=columnas)], ignore_index=True)
 
-df_taller["FECHA_INGRESO"] = pd.to_datetime(df_taller["FECHA_INGRESO"], errors="coerce")
-df_taller["FECHA_EGRESO"] = pd.to_datetime(df_taller["FECHA_EGRESO"], errors="coerce")
-df_taller["MOVIL"] = df_taller["MOVIL"].astype(str)
-df_taller["UNIDAD"] = df_taller["UNIDAD"].astype(str)
+    moviles["JP"] = pd.to_numeric(moviles["JP"], errors="coerce").dropna().astype(int).astype(str)
+    moviles["UNIDAD"] = moviles["UNIDAD"].astype(str).str.upper()
+    for col in ("MARCA", "MODELO"):
+        moviles[col] = moviles[col].fillna("").astype(str).str.upper().str.strip()
+    return moviles
 
-# -------------------------------------------------
-# INGRESO MOVIL
-# -------------------------------------------------
-st.subheader("➕ Ingreso de móvil al taller")
 
-c1, c2 = st.columns(2)
-unidad = c1.selectbox("Unidad", sorted(moviles["UNIDAD"].unique()))
-movil = c2.selectbox("Móvil (JP)", moviles[moviles["UNIDAD"] == unidad]["JP"])
+@COMPARTIDO.compartido("TALLER_MOVILES")
+def cargar_taller(path, version):
+    return TALLER_INDICES.leer_taller_excel(path)
+
+
+def leer_moviles():
+    return cargar_moviles(MOVILES_FILE, version_archivo(MOVILES_FILE))
+
+
+def leer_taller():
+    return cargar_taller(TALLER_FILE, version_archivo(TALLER_FILE))
+
+
+# Un solo objeto por versión para todas las sesiones (sin copiarlo ni
+# deserializarlo en cada lectura). TALLER_LOTES lo actualiza en el lugar
+# con su lock tomado y TALLER_INDICES ordena lecturas y escrituras.
+@st.cache_resource(show_spinner=False, max_entries=2)
+def cargar_indices(path, version):
+    return TALLER_INDICES.cargar(path, leer_taller)
+
 
-activo = df_taller[
-    (df_taller["UNIDAD"] == unidad) &
-    (df_taller["MOVIL"] == movil) &
-    (df_taller["ESTADO"] != "FINALIZADO")
+def leer_indices():
+    return cargar_indices(TALLER_FILE, version_archivo(TALLER_FILE))
+
+
+def leer_vigente():
+    # Para TALLER_LOTES: se llama con su lock tomado, justo antes de escribir
+    return leer_taller(), leer_indices()
+
+
+TIPOS_TRABAJO = ["MANTENIMIENTO","REPARACIÓN","SINIESTRO","SERVICIO GENERAL"]
+TALLERES = [
+    "TALLER POLICIAL","SERVICIO OFICIAL","GOMERIA",
+    "ELECTRICISTA","CHAPISTA","OTRO"
 ]
 
-if not activo.empty:
-    st.warning("⚠️ Este móvil ya tiene un trabajo activo.")
-else:
-    with st.form("ingreso"):
-        tipo = st.selectbox("Tipo trabajo", ["MANTENIMIENTO","REPARACIÓN","SINIESTRO","SERVICIO GENERAL"])
-        taller = st.selectbox("Taller", [
-            "TALLER POLICIAL","SERVICIO OFICIAL","GOMERIA",
-            "ELECTRICISTA","CHAPISTA","OTRO"
-        ])
-        desc = st.text_area("Descripción")
-        ok = st.form_submit_button("Ingresar")
+# -------------------------------------------------
+# INGRESO MOVIL
+# -------------------------------------------------
+@st.fragment
+def ingreso():
+    moviles = leer_moviles()
+    indices = leer_indices()
+
+    st.subheader("➕ Ingreso de móvil al taller")
+
+    c1, c2 = st.columns(2)
+    unidad = c1.selectbox("Unidad", sorted(moviles["UNIDAD"].unique()))
+    movil = c2.selectbox("Móvil (JP)", moviles[moviles["UNIDAD"] == unidad]["JP"])
+
+    if TALLER_INDICES.activo(indices, unidad, movil):
+        st.warning("⚠️ Este móvil ya tiene un trabajo activo.")
+    else:
+        with st.form("ingreso"):
+            tipo = st.selectbox("Tipo trabajo", TIPOS_TRABAJO)
+            taller = st.selectbox("Taller", TALLERES)
+            desc = st.text_area("Descripción")
+            ok = st.form_submit_button("Ingresar")
+
+            if ok:
+                vehiculo = pd.DataFrame({"UNIDAD": [unidad], "JP": [movil]})
+                ingresados, _ = TALLER_LOTES.ingresar(TALLER_FILE, leer_vigente, vehiculo, tipo, taller, desc)
+                if ingresados:
+                    st.success("✔ Móvil ingresado")
+                    # Rerun completo: el ingreso cambia tablas e indicadores
+                    st.rerun()
+                st.warning("⚠️ Este móvil ya tiene un trabajo activo.")
+
+ingreso()
+
+# -------------------------------------------------
+# INGRESO EN LOTE (CAMPAÑAS DE SERVICIO)
+# -------------------------------------------------
+@st.fragment
+def ingreso_lote():
+    moviles = leer_moviles()
+    indices = leer_indices()
+
+    with st.expander("📦 Ingreso en lote"):
+        criterio = st.radio(
+            "Seleccionar móviles", ["Por unidad", "Por marca/modelo", "Lista de JP"],
+            horizontal=True, key="lote_criterio"
+        )
+
+        no_encontrados = []
+        if criterio == "Por unidad":
+            unidades = st.multiselect("Unidades", sorted(moviles["UNIDAD"].unique()), key="lote_unidades")
+            vehiculos = TALLER_LOTES.seleccionar(moviles, unidades=unidades) if unidades else moviles.iloc[:0]
+        elif criterio == "Por marca/modelo":
+            c1, c2 = st.columns(2)
+            marca = c1.selectbox("Marca", sorted(m for m in moviles["MARCA"].unique() if m), key="lote_marca")
+            modelos = c2.multiselect(
+                "Modelos (vacío = todos)",
+                sorted(m for m in moviles.loc[moviles["MARCA"] == marca, "MODELO"].unique() if m),
+                key="lote_modelos"
+            )
+            # Sin marca (MOVILES sin MARCA cargada) no se selecciona nada, nunca toda la flota
+            vehiculos = TALLER_LOTES.seleccionar(moviles, marca=marca, modelos=modelos) if marca else moviles.iloc[:0]
+        else:
+            jps = TALLER_LOTES.parsear_jps(st.text_area("JP (separados por coma, espacio o renglón)", key="lote_jps"))
+            vehiculos = TALLER_LOTES.seleccionar(moviles, jps=jps)
+            no_encontrados = sorted(set(jps) - set(vehiculos["JP"]), key=int)
+
+        conflictos = TALLER_LOTES.conflictos(indices, vehiculos)
+        st.caption(f"{len(vehiculos)} móviles seleccionados · {len(conflictos)} con trabajo activo (se omiten)")
+        if no_encontrados:
+            st.warning("JP no encontrados en MOVILES: " + ", ".join(no_encontrados))
+        if conflictos:
+            st.dataframe(
+                pd.DataFrame(conflictos, columns=["UNIDAD", "MOVIL"]), hide_index=True, use_container_width=True
+            )
+
+        with st.form("ingreso_lote"):
+            tipo = st.selectbox("Tipo trabajo", TIPOS_TRABAJO, key="lote_tipo")
+            taller = st.selectbox("Taller", TALLERES, key="lote_taller")
+            desc = st.text_area("Descripción", key="lote_descripcion")
+            ok = st.form_submit_button(f"Ingresar {len(vehiculos) - len(conflictos)} móviles")
 
         if ok:
-            df_taller = pd.concat([df_taller, pd.DataFrame([{
-                "FECHA_INGRESO": datetime.now(),
-                "FECHA_EGRESO": pd.NaT,
-                "UNIDAD": unidad,
-                "MOVIL": movil,
-                "TIPO_TRABAJO": tipo,
-                "DESCRIPCION": desc.upper(),
-                "TALLER": taller,
-                "RESPONSABLE": "",
-                "ESTADO": "INGRESADO"
-            }])])
-            df_taller.to_excel(TALLER_FILE, index=False)
-            st.success("✔ Móvil ingresado")
-            st.rerun()
+            ingresados, omitidos = TALLER_LOTES.ingresar(TALLER_FILE, leer_vigente, vehiculos, tipo, taller, desc)
+            if ingresados:
+                st.success(f"✔ {len(ingresados)} móviles ingresados ({len(omitidos)} omitidos)")
+                st.rerun()
+            st.warning("Ningún móvil para ingresar.")
+
+ingreso_lote()
 
 st.divider()
 
 # -------------------------------------------------
 # TABLAS EDITABLES (ÚNICO CAMBIO)
 # -------------------------------------------------
+@st.fragment
 def tabla_estado(titulo, estado):
+    df_taller = leer_taller()
+
     st.subheader(titulo)
 
-    df = df_taller[df_taller["ESTADO"] == estado].copy()
+    df = COMPARTIDO.contar(f"taller {estado}", df_taller[df_taller["ESTADO"] == estado])
 
     if df.empty:
         st.info("Sin registros")
         return
 
+    # Columna LOTE: órdenes marcadas para moverlas juntas de estado
+    todas = st.checkbox("Marcar todas", key=f"lote_todas_{estado}")
+    df.insert(0, "LOTE", todas)
+
     edit = st.data_editor(
         df,
         key=f"editor_{estado}",
         use_container_width=True,
         column_config={
+            "LOTE": st.column_config.CheckboxColumn("Lote"),
             "ESTADO": st.column_config.SelectboxColumn(
                 "Estado",
                 options=["INGRESADO","EN REPARACIÓN","FINALIZADO"]
@@ -132,28 +230,25 @@ def tabla_estado(titulo, estado):
         ]
     )
 
-    if st.button(f"Guardar cambios – {titulo}", key=f"btn_{estado}"):
-        for _, row in edit.iterrows():
-
-            idx = df_taller.index[
-                (df_taller["UNIDAD"] == row["UNIDAD"]) &
-                (df_taller["MOVIL"] == row["MOVIL"]) &
-                (df_taller["FECHA_INGRESO"] == row["FECHA_INGRESO"])
-            ]
-
-            if idx.empty:
-                continue
-
-            idx = idx[0]
-
-            if row["ESTADO"] == "FINALIZADO" and pd.isna(df_taller.loc[idx, "FECHA_EGRESO"]):
-                df_taller.loc[idx, "FECHA_EGRESO"] = datetime.now()
-
-            df_taller.loc[idx, "ESTADO"] = row["ESTADO"]
-            df_taller.loc[idx, "RESPONSABLE"] = row["RESPONSABLE"]
-
-        df_taller.to_excel(TALLER_FILE, index=False)
+    c1, c2, c3 = st.columns([2, 2, 1])
+    if c1.button(f"Guardar cambios – {titulo}", key=f"btn_{estado}"):
+        # Solo las órdenes editadas; marcar LOTE no es un cambio
+        editables = ["ESTADO", "RESPONSABLE"]
+        cambiadas = edit[(edit[editables] != df[editables]).any(axis=1)]
+        TALLER_LOTES.actualizar(TALLER_FILE, leer_vigente, cambiadas[TALLER_LOTES.CLAVE_ORDEN + editables])
         st.success("✔ Actualizado")
+        # Rerun completo: el cambio de estado mueve filas entre tablas
+        st.rerun()
+
+    marcadas = edit[edit["LOTE"]]
+    destino = c2.selectbox(
+        "Mover marcadas a", [e for e in TALLER_INDICES.ESTADOS if e != estado],
+        key=f"lote_destino_{estado}", label_visibility="collapsed"
+    )
+    if c3.button(f"Mover {len(marcadas)} a {destino}", key=f"lote_btn_{estado}", disabled=marcadas.empty):
+        # Solo cambia el estado: el responsable de cada orden queda como estaba
+        TALLER_LOTES.actualizar(TALLER_FILE, leer_vigente, marcadas[TALLER_LOTES.CLAVE_ORDEN].assign(ESTADO=destino))
+        st.success(f"✔ {len(marcadas)} órdenes movidas a {destino}")
         st.rerun()
 
 tabla_estado("🔴 Fuera de servicio", "INGRESADO")
@@ -162,31 +257,76 @@ tabla_estado("🟡 En reparación", "EN REPARACIÓN")
 # -------------------------------------------------
 # OPERATIVOS (SOLO LECTURA)
 # -------------------------------------------------
-st.subheader("🟢 Operativos (finalizados)")
-st.dataframe(
-    df_taller[df_taller["ESTADO"] == "FINALIZADO"],
-    use_container_width=True
-)
+@st.fragment
+def operativos():
+    df_taller = leer_taller()
+
+    st.subheader("🟢 Operativos (finalizados)")
+    st.dataframe(
+        df_taller[df_taller["ESTADO"] == "FINALIZADO"],
+        use_container_width=True
+    )
+
+operativos()
+
+# -------------------------------------------------
+# EXPORTAR HISTORIAL
+# -------------------------------------------------
+@st.fragment
+def exportar_historial():
+    df_taller = leer_taller()
+
+    st.subheader("📤 Exportar historial del taller")
+    c1, c2 = st.columns(2)
+    unidad = c1.selectbox(
+        "Unidad del historial", ["TODAS"] + sorted(df_taller["UNIDAD"].dropna().astype(str).unique()),
+        key="taller_exportar_unidad"
+    )
+    estado = c2.selectbox(
+        "Estado del historial", ["TODOS"] + TALLER_INDICES.ESTADOS, key="taller_exportar_estado"
+    )
+
+    filas = df_taller
+    if unidad != "TODAS":
+        filas = filas[filas["UNIDAD"] == unidad]
+    if estado != "TODOS":
+        filas = filas[filas["ESTADO"] == estado]
+
+    EXPORTAR.boton_exportar(
+        filas, EXPORTAR.nombre_archivo("taller", unidad, estado), key="taller_exportar"
+    )
+
+exportar_historial()
 
 # -------------------------------------------------
 # DASHBOARD Y RANKING
 # -------------------------------------------------
 st.divider()
-st.subheader("📊 Indicadores del Taller")
 
-c1, c2, c3 = st.columns(3)
-c1.metric("🔴 Fuera de servicio", (df_taller["ESTADO"]=="INGRESADO").sum())
-c2.metric("🟡 En reparación", (df_taller["ESTADO"]=="EN REPARACIÓN").sum())
-c3.metric("🟢 Operativos", (df_taller["ESTADO"]=="FINALIZADO").sum())
+@st.fragment
+def indicadores():
+    indices = leer_indices()
+
+    st.subheader("📊 Indicadores del Taller")
+
+    c1, c2, c3 = st.columns(3)
+    c1.metric("🔴 Fuera de servicio", TALLER_INDICES.contador(indices, "INGRESADO"))
+    c2.metric("🟡 En reparación", TALLER_INDICES.contador(indices, "EN REPARACIÓN"))
+    c3.metric("🟢 Operativos", TALLER_INDICES.contador(indices, "FINALIZADO"))
+
+indicadores()
 
 st.divider()
-st.subheader("🏆 Ranking de móviles reincidentes")
 
-ranking = (
-    df_taller.groupby(["UNIDAD","MOVIL"])
-    .size()
-    .reset_index(name="INGRESOS")
-    .sort_values("INGRESOS", ascending=False)
-)
+@st.fragment
+def ranking_reincidentes():
+    indices = leer_indices()
+
+    st.subheader("🏆 Ranking de móviles reincidentes")
+
+    ventana = st.radio("Período", list(TALLER_INDICES.VENTANAS), horizontal=True, key="ventana_ranking")
+    ranking = TALLER_INDICES.top(indices, ventana, n=20)
+
+    st.dataframe(ranking, use_container_width=True)
 
-st.dataframe(ranking, use_container_width=True)
+ranking_reincidentes()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# ---------------------------------------------------------
+# CONFIGURACIÓN DE PRUEBAS
+# ---------------------------------------------------------
+# Los módulos de la app viven en la raíz del repositorio y usan rutas
+# relativas (uploads/, .cache/): cada prueba corre en una carpeta vacía.
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def carpeta(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("uploads")
+    return tmp_path
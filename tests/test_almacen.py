@@ -0,0 +1,58 @@
+import os
+import threading
+
+import pytest
+
+import ALMACEN
+
+
+def leer(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_guardar_upload_deduplica(carpeta):
+    digest, nuevo = ALMACEN.guardar_upload("MOVILES.xlsx", b"v1")
+    assert nuevo
+    assert ALMACEN.guardar_upload("MOVILES.xlsx", b"v1") == (digest, False)
+    assert len(os.listdir(ALMACEN.STORE_FOLDER)) == 1
+    assert leer(os.path.join("uploads", "MOVILES.xlsx")) == b"v1"
+
+
+def test_restaurar_publica_version_anterior(carpeta):
+    v1, _ = ALMACEN.guardar_upload("MOVILES.xlsx", b"v1")
+    v2, _ = ALMACEN.guardar_upload("MOVILES.xlsx", b"v2")
+    assert ALMACEN.version_actual("MOVILES.xlsx") == v2
+
+    assert ALMACEN.restaurar("MOVILES.xlsx", v1)
+    assert not ALMACEN.restaurar("MOVILES.xlsx", v1)
+    assert ALMACEN.version_actual("MOVILES.xlsx") == v1
+    assert leer(ALMACEN.ruta_actual("MOVILES.xlsx")) == b"v1"
+    assert leer(os.path.join("uploads", "MOVILES.xlsx")) == b"v1"
+    assert [v["sha256"] for v in ALMACEN.historial("MOVILES.xlsx")] == [v1, v2]
+
+    with pytest.raises(ValueError):
+        ALMACEN.restaurar("MOVILES.xlsx", "0" * 64)
+
+
+def test_upload_retenido_no_revierte_restauracion(carpeta):
+    sesion = {}
+    v1, _ = ALMACEN.guardar_upload("DSICCO.xlsx", b"v1")
+    assert ALMACEN.guardar_upload_una_vez("DSICCO.xlsx", b"v2", "archivo-1", sesion)[1]
+
+    # Otro usuario restaura v1; el uploader de esta sesión sigue con v2
+    ALMACEN.restaurar("DSICCO.xlsx", v1)
+    assert ALMACEN.guardar_upload_una_vez("DSICCO.xlsx", b"v2", "archivo-1", sesion) is None
+    assert ALMACEN.version_actual("DSICCO.xlsx") == v1
+
+
+def test_subidas_concurrentes_no_pierden_versiones(carpeta):
+    hilos = [
+        threading.Thread(target=ALMACEN.guardar_upload, args=("DSICCO.xlsx", f"v{i}".encode()))
+        for i in range(20)
+    ]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+    assert len(ALMACEN.historial("DSICCO.xlsx")) == 20
@@ -0,0 +1,106 @@
+import os
+import random
+
+import pandas as pd
+import pytest
+
+import FLOTA
+import PARTICIONES
+from DATOS_SINTETICOS import vehiculos
+
+
+def escribir(path, flota, motos):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        flota.to_excel(writer, sheet_name="FLOTA AUTOMOTRIZ", index=False)
+        motos.to_excel(writer, sheet_name="MOTOCICLETAS", index=False)
+
+
+@pytest.fixture
+def planilla(carpeta, monkeypatch):
+    monkeypatch.setattr(FLOTA, "_vigente", None)
+    rnd = random.Random(2025)
+    flota = vehiculos(40, rnd)
+    motos = vehiculos(20, rnd, motos=True, jp_desde=41)
+    path = os.path.join(carpeta, "MOVILES.xlsx")
+    escribir(path, flota, motos)
+    FLOTA.sincronizar(path)
+    return path, flota, motos
+
+
+def test_celda_vacia_registra_un_solo_cambio(planilla):
+    path, flota, motos = planilla
+    antes = len(FLOTA.leer_eventos())
+
+    # La columna AÑO pasa de int a float: el resto de las filas no cambia
+    motos.loc[3, "AÑO"] = None
+    escribir(path, flota, motos)
+    estado = FLOTA.sincronizar(path)
+
+    nuevos = FLOTA.leer_eventos().iloc[antes:]
+    assert list(nuevos["tipo"]) == ["CAMBIO"]
+    assert nuevos.iloc[0]["campo"] == "AÑO" and nuevos.iloc[0]["despues"] == "NAN"
+    assert estado["ultimo_diff"]["MOTOS"]["cambios"] == 1
+
+
+def test_baja_no_cambia_las_filas_renumeradas(planilla):
+    path, flota, motos = planilla
+    antes = len(FLOTA.leer_eventos())
+    baja = flota.loc[5, "DOMINIO"]
+
+    flota = flota.drop(index=5).reset_index(drop=True)
+    flota["ORDEN N° "] = range(1, len(flota) + 1)
+    escribir(path, flota, motos)
+    estado = FLOTA.sincronizar(path)
+
+    nuevos = FLOTA.leer_eventos().iloc[antes:]
+    assert list(nuevos["tipo"]) == ["BAJA"] and nuevos.iloc[0]["clave"] == baja
+    # El estado guarda la numeración nueva aunque no entre al diff
+    assert list(estado["hojas"]["FLOTA"]["ORDEN N°"]) == [str(i) for i in range(1, 40)]
+
+
+def test_corte_antes_de_guardar_estado_no_duplica_eventos(planilla, monkeypatch):
+    path, flota, motos = planilla
+    antes = len(FLOTA.leer_eventos())
+    flota.loc[0, "SITUACION ACTUAL"] = "EN REPARACION"
+    escribir(path, flota, motos)
+
+    def cortar(estado):
+        raise RuntimeError("corte")
+
+    with monkeypatch.context() as m:
+        m.setattr(FLOTA, "_guardar_estado", cortar)
+        with pytest.raises(RuntimeError):
+            FLOTA.sincronizar(path)
+
+    FLOTA.sincronizar(path)
+    nuevos = FLOTA.leer_eventos().iloc[antes:]
+    assert list(nuevos["campo"]) == ["SITUACION ACTUAL"]
+
+
+def igualan_a_partir_todo(path, derivado):
+    completo = PARTICIONES.derivar(
+        "COMPLETO", FLOTA.sincronizar(path)["version"][:16], FLOTA.COLUMNA_PARTICION,
+        FLOTA.sincronizar(path)["hojas"], FLOTA.resumir,
+    )
+    assert PARTICIONES.valores(derivado) == PARTICIONES.valores(completo)
+    for valor in PARTICIONES.valores(completo):
+        assert PARTICIONES.resumen(derivado, valor) == PARTICIONES.resumen(completo, valor)
+        for hoja, df in PARTICIONES.cargar(completo, valor).items():
+            pd.testing.assert_frame_equal(PARTICIONES.cargar(derivado, valor)[hoja], df)
+
+
+def test_particiones_derivadas_igualan_a_partir_todo(planilla):
+    path, flota, motos = planilla
+    FLOTA.indice(path)
+
+    flota.loc[2, "SITUACION ACTUAL"] = "EN REPARACION"
+    escribir(path, flota, motos)
+    derivado = FLOTA.indice(path)
+    assert FLOTA.sincronizar(path)["particiones"]["tocados"] == {flota.loc[2, "DIRECCION"].upper()}
+    igualan_a_partir_todo(path, derivado)
+
+    # Una baja renumera las filas siguientes: sus direcciones también se vuelven a partir
+    motos = motos.drop(index=4).reset_index(drop=True)
+    motos["ORDEN N° "] = range(1, len(motos) + 1)
+    escribir(path, flota, motos)
+    igualan_a_partir_todo(path, FLOTA.indice(path))
@@ -0,0 +1,63 @@
+import os
+
+import pandas as pd
+
+import PARTICIONES
+
+
+def hojas():
+    return {
+        "A": pd.DataFrame({"UNIDAD": ["UR I", "UR II", None, "UR I"], "N": [1, 2, 3, 4]}),
+        "B": pd.DataFrame({"UNIDAD": ["UR II", "UR III"], "N": [10, 20]}),
+    }
+
+
+def resumir(parte):
+    return {"N": {hoja: int(df["N"].sum()) for hoja, df in parte.items()}, "FILAS": sum(map(len, parte.values()))}
+
+
+def test_filtrar_usa_el_criterio_de_las_particiones():
+    filtradas = PARTICIONES.filtrar(hojas(), "UNIDAD", "UR I")
+    assert list(filtradas["A"]["N"]) == [1, 4] and filtradas["B"].empty
+    assert list(PARTICIONES.filtrar(hojas(), "UNIDAD", PARTICIONES.SIN_VALOR)["A"]["N"]) == [3]
+
+
+def test_sumar_resumenes():
+    assert PARTICIONES.sumar([]) == {}
+    assert PARTICIONES.sumar([{"x": 1, "y": {"z": 2}}, {"x": 3, "y": {"z": 4, "w": 1}}]) == {"x": 4, "y": {"z": 6, "w": 1}}
+    unidos = PARTICIONES.sumar([pd.DataFrame({"c": [1]}), pd.DataFrame({"c": [2]})])
+    assert list(unidos["c"]) == [1, 2]
+
+
+def test_particiones_y_resumen(carpeta):
+    path = os.path.join(carpeta, "datos.bin")
+    with open(path, "wb") as f:
+        f.write(b"v1")
+    indice = PARTICIONES.particiones("PRUEBA", path, "UNIDAD", lambda p: hojas(), resumir)
+
+    assert PARTICIONES.valores(indice) == sorted(["UR I", "UR II", "UR III", PARTICIONES.SIN_VALOR])
+    assert PARTICIONES.resumen(indice, "UR II") == {"N": {"A": 2, "B": 10}, "FILAS": 2}
+    assert PARTICIONES.resumen(indice) == {"N": {"A": 10, "B": 30}, "FILAS": 6}
+    assert list(PARTICIONES.cargar(indice, "UR I")["A"]["N"]) == [1, 4]
+
+
+def test_derivar_solo_parte_lo_tocado(carpeta):
+    v1 = hojas()
+    base = PARTICIONES.derivar("PRUEBA", "v1", "UNIDAD", v1, resumir)
+
+    v2 = hojas()
+    v2["A"].loc[1, "N"] = 99  # UR II cambia, UR I y UR III no
+    derivado = PARTICIONES.derivar("PRUEBA", "v2", "UNIDAD", v2, resumir, base="v1", tocados={"UR II"})
+
+    def archivo(indice, valor):
+        return os.stat(os.path.join(indice["carpeta"], indice["particiones"][valor]["archivo"]))
+
+    # Lo que no cambió es el mismo archivo de la versión anterior
+    assert os.path.samestat(archivo(base, "UR I"), archivo(derivado, "UR I"))
+    assert not os.path.samestat(archivo(base, "UR II"), archivo(derivado, "UR II"))
+
+    completo = PARTICIONES.derivar("COMPLETO", "v2", "UNIDAD", v2, resumir)
+    for valor in PARTICIONES.valores(completo):
+        assert PARTICIONES.resumen(derivado, valor) == PARTICIONES.resumen(completo, valor)
+        for hoja, df in PARTICIONES.cargar(completo, valor).items():
+            pd.testing.assert_frame_equal(PARTICIONES.cargar(derivado, valor)[hoja], df)
@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import TALLER_INDICES
+
+
+def historial(n, rnd):
+    hoy = datetime.now()
+    filas = [
+        {
+            "FECHA_INGRESO": hoy - timedelta(days=rnd.randint(0, 200), hours=rnd.randint(0, 23)),
+            "UNIDAD": rnd.choice(["UR I", "UR II", "UR III"]),
+            "MOVIL": str(rnd.randint(1, 15)),
+            "ESTADO": "INGRESADO",
+        }
+        for _ in range(n)
+    ]
+    return pd.DataFrame(filas).sort_values("FECHA_INGRESO", ignore_index=True)
+
+
+def comparables(indices):
+    return {
+        "contadores": {e: n for e, n in indices["contadores"].items() if n},
+        "activos": indices["activos"],
+        "ventanas": {
+            nombre: (v["conteos"], v["orden"]) for nombre, v in indices["ventanas"].items()
+        },
+    }
+
+
+def test_indices_incrementales_igualan_a_construir():
+    rnd = random.Random(7)
+    df = historial(300, rnd)
+
+    indices = TALLER_INDICES.nuevo_indice()
+    for fila in df.itertuples():
+        TALLER_INDICES.registrar_ingreso(indices, fila.UNIDAD, fila.MOVIL, fila.FECHA_INGRESO.to_pydatetime())
+    for i in rnd.sample(range(len(df)), 120):
+        antes = df.at[i, "ESTADO"]
+        despues = rnd.choice(TALLER_INDICES.ESTADOS)
+        TALLER_INDICES.registrar_transicion(indices, antes, despues, (df.at[i, "UNIDAD"], df.at[i, "MOVIL"]))
+        df.at[i, "ESTADO"] = despues
+
+    assert comparables(indices) == comparables(TALLER_INDICES.construir(df))
+    assert all(v["orden"] == sorted(v["orden"]) for v in indices["ventanas"].values())
+
+
+def test_expirar_deja_solo_la_ventana():
+    rnd = random.Random(11)
+    df = historial(200, rnd)
+    indices = TALLER_INDICES.construir(df)
+
+    hoy = datetime.now() + timedelta(days=45)
+    TALLER_INDICES.expirar(indices, hoy)
+    for nombre, dias in TALLER_INDICES.VENTANAS.items():
+        vigentes = df if dias is None else df[df["FECHA_INGRESO"] >= hoy - timedelta(days=dias)]
+        esperado = vigentes.groupby(["UNIDAD", "MOVIL"]).size().to_dict()
+        assert indices["ventanas"][nombre]["conteos"] == esperado
+
+    top = TALLER_INDICES.top(indices, "ÚLTIMOS 90 DÍAS", n=5, hoy=hoy)
+    assert list(top["INGRESOS"]) == sorted(top["INGRESOS"], reverse=True)
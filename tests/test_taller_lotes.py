@@ -0,0 +1,56 @@
+import warnings
+
+import pandas as pd
+
+import TALLER_INDICES
+import TALLER_LOTES
+
+
+def flota():
+    return pd.DataFrame({
+        "UNIDAD": ["UR I", "UR I", "UR II", "UR II"],
+        "JP": ["1", "2", "3", "4"],
+        "MARCA": ["FORD", "TOYOTA", "FORD", ""],
+        "MODELO": ["RANGER", "HILUX", "FOCUS", ""],
+    })
+
+
+def test_seleccionar_sin_criterios_no_devuelve_nada():
+    moviles = flota()
+    assert TALLER_LOTES.seleccionar(moviles).empty
+    assert TALLER_LOTES.seleccionar(moviles, unidades=[], marca="", modelos=[]).empty
+
+
+def test_seleccionar_combina_criterios():
+    moviles = flota()
+    assert list(TALLER_LOTES.seleccionar(moviles, unidades=["UR I"])["JP"]) == ["1", "2"]
+    assert list(TALLER_LOTES.seleccionar(moviles, marca="FORD", modelos=["FOCUS"])["JP"]) == ["3"]
+    # Una lista de JP vacía es un criterio: no hay JP que coincidan
+    assert TALLER_LOTES.seleccionar(moviles, jps=[]).empty
+    assert list(TALLER_LOTES.seleccionar(moviles, jps=TALLER_LOTES.parsear_jps("4, 2 4"))["JP"]) == ["2", "4"]
+
+
+def test_ingresar_y_actualizar_en_lote(carpeta):
+    taller_file = str(carpeta / "TALLER_MOVILES.xlsx")
+
+    def cargar():
+        df = TALLER_INDICES.leer_taller_excel(taller_file)
+        return df, TALLER_INDICES.cargar(taller_file, lambda: df)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        ingresados, omitidos = TALLER_LOTES.ingresar(taller_file, cargar, flota(), "MECANICA", "TALLER", "service")
+        assert len(ingresados) == 4 and omitidos == []
+        # Ya activos: el segundo lote no ingresa nada
+        assert TALLER_LOTES.ingresar(taller_file, cargar, flota(), "MECANICA", "TALLER", "service")[0] == []
+
+    df, indices = cargar()
+    assert df["FECHA_EGRESO"].dtype == df["FECHA_INGRESO"].dtype
+    assert TALLER_LOTES.actualizar(taller_file, cargar, df.iloc[:0]) == 0
+
+    cambios = df.iloc[[1]][TALLER_LOTES.CLAVE_ORDEN].assign(ESTADO="FINALIZADO")
+    assert TALLER_LOTES.actualizar(taller_file, cargar, cambios) == 1
+    df, indices = cargar()
+    assert df["FECHA_EGRESO"].notna().sum() == 1
+    assert not TALLER_INDICES.activo(indices, "UR I", "2")
+    assert TALLER_INDICES.contador(indices, "INGRESADO") == 3